@@ -1,3 +1,55 @@
 from django.contrib import admin
 
-# Register your models here.
+from config.admin import LargeTableAdmin
+from policies.matching import normalize_policy_number
+from .models import CommissionStatement, CommissionTransaction
+from .reconciliation import rereconcile_statements, rereconcile_transactions
+
+
+@admin.register(CommissionStatement)
+class CommissionStatementAdmin(LargeTableAdmin):
+    list_display = ['id', 'carrier', 'statement_date', 'total_amount_paid', 'is_processed', 'created_at']
+    list_select_related = ['carrier']
+    list_filter = ['carrier', 'is_processed']
+    search_fields = ['carrier__name']
+    raw_id_fields = ['document']
+    # Maintained by reconciliation (see commissions/reconciliation.py)
+    readonly_fields = ['total_amount_paid', 'is_processed']
+    actions = ['rereconcile']
+
+    def get_queryset(self, request):
+        # __str__ shows the carrier name (also in autocomplete results)
+        return super().get_queryset(request).select_related(*self.list_select_related)
+
+    @admin.action(description="Re-reconcile selected statements")
+    def rereconcile(self, request, queryset):
+        fixed, updated = rereconcile_statements(queryset)
+        self.message_user(request, f"Re-reconciled {updated} statements; {fixed} line statuses corrected.")
+
+
+@admin.register(CommissionTransaction)
+class CommissionTransactionAdmin(LargeTableAdmin):
+    list_display = [
+        'id', 'statement', 'policy', 'policy_number', 'amount_expected', 'amount_received', 'status', 'transaction_date'
+    ]
+    # Statement.__str__ -> carrier.name, Policy.__str__ -> client.name
+    list_select_related = ['statement__carrier', 'policy__client']
+    list_filter = ['status', ('transaction_date', admin.DateFieldListFilter)]
+    search_fields = ['policy__policy_number_key']
+    autocomplete_fields = ['statement', 'policy']
+    # A <select> would load every archived policy into the form
+    raw_id_fields = ['archived_policy']
+    readonly_fields = ['line_key', 'fingerprint']
+    actions = ['rereconcile']
+
+    def get_search_results(self, request, queryset, search_term):
+        # Match the policy's indexed normalized number, not a LIKE scan over every line
+        key = normalize_policy_number(search_term)
+        if not key:
+            return queryset, False
+        return queryset.filter(policy__policy_number_key__startswith=key), False
+
+    @admin.action(description="Re-reconcile selected lines")
+    def rereconcile(self, request, queryset):
+        fixed = rereconcile_transactions(queryset)
+        self.message_user(request, f"{fixed} line statuses corrected.")
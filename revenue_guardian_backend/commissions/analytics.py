@@ -0,0 +1,118 @@
+import math
+from collections import defaultdict
+
+from django.conf import settings
+
+from .models import CarrierPaymentStats, PaymentAnomaly
+
+
+class RunningStats:
+    """
+    Count / mean / M2 with O(1) add, remove and merge.
+    (Welford's update, and Chan et al.'s parallel combination for batches.)
+    """
+
+    def __init__(self, count=0, mean=0.0, m2=0.0):
+        self.count, self.mean, self.m2 = count, mean, m2
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def remove(self, value):
+        if self.count <= 1:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        delta = value - self.mean
+        self.count -= 1
+        self.mean -= delta / self.count
+        self.m2 = max(self.m2 - delta * (value - self.mean), 0.0)
+
+    def merge(self, other):
+        if not other.count:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+
+
+def payout_ratio(amount_expected, amount_received):
+    if not amount_expected or amount_expected <= 0:
+        return None
+    return float(amount_received) / float(amount_expected)
+
+
+def deviation(baseline, batch):
+    """
+    z-score of a batch mean against the baseline distribution
+    (standard error of the mean), or None if there is too little data.
+    """
+    config = settings.PAYMENT_ANOMALY
+    if baseline.count < config['MIN_HISTORY'] or batch.count < config['MIN_LINES']:
+        return None
+    if abs(batch.mean - baseline.mean) < config['MIN_RATIO_SHIFT']:
+        return None
+    std = max(math.sqrt(baseline.variance), config['MIN_STD'])
+    return (batch.mean - baseline.mean) / (std / math.sqrt(batch.count))
+
+
+def record_payment_ratios(statement, added, removed=()):
+    """
+    Folds one statement delta into the carrier's running statistics.
+
+    `added` / `removed` are iterables of (policy_type, amount_expected, amount_received).
+    The new lines are first tested against the history *before* they are
+    merged in, so a drifting statement cannot hide itself. Cost is O(1) per
+    line plus one row update per policy type.
+    Returns the PaymentAnomaly rows created.
+    """
+    batches = defaultdict(RunningStats)
+    for policy_type, expected, received in added:
+        ratio = payout_ratio(expected, received)
+        if policy_type and ratio is not None:
+            batches[policy_type].add(ratio)
+
+    withdrawn = defaultdict(list)
+    for policy_type, expected, received in removed:
+        ratio = payout_ratio(expected, received)
+        if policy_type and ratio is not None:
+            withdrawn[policy_type].append(ratio)
+
+    anomalies = []
+    for policy_type in set(batches) | set(withdrawn):
+        # Lock the row: two statements for one carrier may be ingested at once
+        stats, _ = CarrierPaymentStats.objects.select_for_update().get_or_create(
+            carrier_id=statement.carrier_id, policy_type=policy_type
+        )
+        baseline = RunningStats(stats.count, stats.mean, stats.m2)
+        for ratio in withdrawn[policy_type]:
+            baseline.remove(ratio)
+
+        batch = batches.get(policy_type)
+        if batch:
+            z_score = deviation(baseline, batch)
+            if z_score is not None and abs(z_score) >= settings.PAYMENT_ANOMALY['Z_THRESHOLD']:
+                anomalies.append(PaymentAnomaly(
+                    statement=statement,
+                    carrier_id=statement.carrier_id,
+                    policy_type=policy_type,
+                    line_count=batch.count,
+                    observed_ratio=batch.mean,
+                    baseline_ratio=baseline.mean,
+                    baseline_std=math.sqrt(baseline.variance),
+                    z_score=z_score,
+                ))
+            baseline.merge(batch)
+
+        stats.count, stats.mean, stats.m2 = baseline.count, baseline.mean, baseline.m2
+        stats.save(update_fields=['count', 'mean', 'm2', 'updated_at'])
+
+    return PaymentAnomaly.objects.bulk_create(anomalies)
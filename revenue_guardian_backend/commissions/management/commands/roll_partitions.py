@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from commissions.partitions import add_months, default_partition_rows, ensure_partitions, is_partitioned, month_start
+
+
+class Command(BaseCommand):
+    help = 'Creates monthly commission-line partitions ahead of time (run monthly from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months-ahead', type=int, default=settings.COMMISSION_PARTITION_MONTHS_AHEAD)
+        parser.add_argument('--from', dest='start', help='YYYY-MM-DD: also create older months, moving '
+                                                         'their rows out of the DEFAULT partition')
+
+    def handle(self, *args, **options):
+        if not is_partitioned(connection):
+            self.stdout.write(f"Commission lines are not partitioned on {connection.vendor}; nothing to do.")
+            return
+
+        this_month = month_start(timezone.now().date())
+        first = this_month
+        if options['start']:
+            first = parse_date(options['start'])
+            if first is None:
+                raise CommandError("--from must be YYYY-MM-DD")
+
+        with transaction.atomic():
+            created = ensure_partitions(connection, first, add_months(this_month, options['months_ahead']))
+        for name, moved in created:
+            self.stdout.write(f"Created {name}" + (f" (moved {moved} rows out of DEFAULT)" if moved else ""))
+
+        leftover = default_partition_rows(connection)
+        if leftover:
+            self.stdout.write(self.style.WARNING(
+                f"⚠️  {leftover} lines are in the DEFAULT partition; create their months with --from."
+            ))
+        self.stdout.write(self.style.SUCCESS(f"✅ Process Complete. Created {len(created)} partitions."))
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('commissions', '0002_initial'),
+        ('documents', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='commissionstatement',
+            name='document',
+            field=models.ForeignKey(blank=True, help_text='Content-addressed copy of the statement file', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='statements', to='documents.document'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('commissions', '0003_commissionstatement_document'),
+        ('documents', '0001_initial'),
+        ('policies', '0003_policy_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatementRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField()),
+                ('line_count', models.PositiveIntegerField(default=0)),
+                ('inserted', models.PositiveIntegerField(default=0)),
+                ('updated', models.PositiveIntegerField(default=0)),
+                ('removed', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['statement', 'version'],
+            },
+        ),
+        migrations.AddField(
+            model_name='commissiontransaction',
+            name='fingerprint',
+            field=models.CharField(blank=True, help_text='Hash of the line content', max_length=40),
+        ),
+        migrations.AddField(
+            model_name='commissiontransaction',
+            name='line_key',
+            field=models.CharField(blank=True, max_length=40),
+        ),
+        migrations.AddField(
+            model_name='commissiontransaction',
+            name='policy_number',
+            field=models.CharField(blank=True, help_text='Policy number as printed by the Carrier', max_length=100),
+        ),
+        migrations.AddConstraint(
+            model_name='commissiontransaction',
+            constraint=models.UniqueConstraint(condition=models.Q(('line_key', ''), _negated=True), fields=('statement', 'line_key'), name='unique_statement_line_key'),
+        ),
+        migrations.AddField(
+            model_name='statementrevision',
+            name='document',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='statement_revisions', to='documents.document'),
+        ),
+        migrations.AddField(
+            model_name='statementrevision',
+            name='statement',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='commissions.commissionstatement'),
+        ),
+        migrations.AddConstraint(
+            model_name='statementrevision',
+            constraint=models.UniqueConstraint(fields=('statement', 'version'), name='unique_statement_version'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('commissions', '0004_statement_revisions'),
+        ('policies', '0003_policy_document'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='commissiontransaction',
+            index=models.Index(fields=['statement', 'status'], name='commission_statement_status'),
+        ),
+        migrations.AddIndex(
+            model_name='commissiontransaction',
+            index=models.Index(fields=['policy', 'transaction_date'], name='commission_policy_date'),
+        ),
+    ]
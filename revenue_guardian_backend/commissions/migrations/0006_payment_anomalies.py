@@ -0,0 +1,49 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('commissions', '0005_discrepancy_indexes'),
+        ('policies', '0005_client_blocking_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentAnomaly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('policy_type', models.CharField(choices=[('LIFE', 'Life Insurance'), ('HEALTH', 'Health Insurance'), ('AUTO', 'Vehicle Insurance'), ('HOME', 'Home Insurance')], max_length=20)),
+                ('line_count', models.PositiveIntegerField()),
+                ('observed_ratio', models.FloatField(help_text='Mean received/expected on this statement')),
+                ('baseline_ratio', models.FloatField(help_text='Historical mean before this statement')),
+                ('baseline_std', models.FloatField()),
+                ('z_score', models.FloatField()),
+                ('acknowledged', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('carrier', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payment_anomalies', to='policies.carrier')),
+                ('statement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='anomalies', to='commissions.commissionstatement')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CarrierPaymentStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('policy_type', models.CharField(choices=[('LIFE', 'Life Insurance'), ('HEALTH', 'Health Insurance'), ('AUTO', 'Vehicle Insurance'), ('HOME', 'Home Insurance')], max_length=20)),
+                ('count', models.BigIntegerField(default=0)),
+                ('mean', models.FloatField(default=0.0)),
+                ('m2', models.FloatField(default=0.0, help_text='Sum of squared deviations from the mean')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('carrier', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payment_stats', to='policies.carrier')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('carrier', 'policy_type'), name='unique_carrier_policy_type_stats')],
+            },
+        ),
+    ]
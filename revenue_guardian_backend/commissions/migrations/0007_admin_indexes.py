@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('commissions', '0006_payment_anomalies'),
+        ('policies', '0005_client_blocking_keys'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='commissiontransaction',
+            index=models.Index(fields=['status', 'transaction_date'], name='commission_status_date'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('commissions', '0007_admin_indexes'),
+        ('policies', '0007_archived_policy'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='commissiontransaction',
+            name='unique_statement_line_key',
+        ),
+        migrations.AddField(
+            model_name='commissiontransaction',
+            name='archived_policy',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='commissions', to='policies.archivedpolicy'),
+        ),
+        migrations.AddConstraint(
+            model_name='commissiontransaction',
+            constraint=models.UniqueConstraint(condition=models.Q(('line_key', ''), _negated=True), fields=('statement', 'line_key', 'transaction_date'), name='unique_statement_line_key'),
+        ),
+    ]
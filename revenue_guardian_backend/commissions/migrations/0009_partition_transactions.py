@@ -0,0 +1,79 @@
+from django.db import migrations
+from django.utils import timezone
+
+from commissions.partitions import DEFAULT_PARTITION, TABLE, add_months, create_partition, month_start, months_between
+
+LEGACY = f'{TABLE}_legacy'
+SEQUENCE = f'{TABLE}_id_seq'
+
+# Months created ahead of today; roll_partitions keeps this window moving
+MONTHS_AHEAD = 3
+
+
+def partition_transactions(apps, schema_editor):
+    """
+    Rebuilds commission lines as a table range-partitioned by
+    transaction_date (PostgreSQL only; other backends keep a plain table).
+
+    The primary key becomes (id, transaction_date), as PostgreSQL requires
+    the partition key in every unique index; ids still come from one
+    sequence, so they stay unique. Copies every row once, so run it in
+    a maintenance window on large installs.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+
+    model = apps.get_model('commissions', 'CommissionTransaction')
+    with connection.cursor() as cursor:
+        # 1. Partitioned parent with the same columns, DEFAULT partition, monthly partitions
+        cursor.execute(f'ALTER TABLE "{TABLE}" RENAME TO "{LEGACY}"')
+        cursor.execute(f'CREATE TABLE "{TABLE}" (LIKE "{LEGACY}" INCLUDING DEFAULTS) PARTITION BY RANGE (transaction_date)')
+        cursor.execute(f'CREATE TABLE "{DEFAULT_PARTITION}" PARTITION OF "{TABLE}" DEFAULT')
+
+        cursor.execute(f'SELECT min(transaction_date), max(id) FROM "{LEGACY}"')
+        first_date, max_id = cursor.fetchone()
+        this_month = month_start(timezone.now().date())
+        for month in months_between(first_date or this_month, add_months(this_month, MONTHS_AHEAD)):
+            create_partition(cursor, month)
+
+        # 2. Move the rows, drop the old table (and its indexes, FKs and identity sequence)
+        cursor.execute(f'INSERT INTO "{TABLE}" SELECT * FROM "{LEGACY}"')
+        cursor.execute(f'DROP TABLE "{LEGACY}"')
+
+        # 3. Ids continue from the same number
+        cursor.execute(f'CREATE SEQUENCE "{SEQUENCE}" OWNED BY "{TABLE}".id')
+        cursor.execute('SELECT setval(%s, %s, %s)', [SEQUENCE, max_id or 1, max_id is not None])
+        cursor.execute(f'ALTER TABLE "{TABLE}" ALTER COLUMN id SET DEFAULT nextval(\'"{SEQUENCE}"\')')
+        cursor.execute(f'ALTER TABLE "{TABLE}" ADD PRIMARY KEY (id, transaction_date)')
+
+        # 4. Foreign keys. statement_id and policy_id lead composite indexes
+        #    below, so only archived_policy_id needs an index of its own.
+        for column, target in (
+            ('statement_id', 'commissions_commissionstatement'),
+            ('policy_id', 'policies_policy'),
+            ('archived_policy_id', 'policies_archivedpolicy'),
+        ):
+            cursor.execute(
+                f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{TABLE}_{column}_fk" FOREIGN KEY ({column}) '
+                f'REFERENCES "{target}" (id) DEFERRABLE INITIALLY DEFERRED'
+            )
+        cursor.execute(f'CREATE INDEX "{TABLE}_archived_policy_id_idx" ON "{TABLE}" (archived_policy_id)')
+
+    # 5. Model indexes and constraints, created on the parent and cloned to every partition
+    for index in model._meta.indexes:
+        schema_editor.add_index(model, index)
+    for constraint in model._meta.constraints:
+        schema_editor.add_constraint(model, constraint)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('commissions', '0008_archived_policy_link'),
+    ]
+
+    operations = [
+        # Not reversed: the partitioned table behaves exactly like the plain one
+        migrations.RunPython(partition_transactions, migrations.RunPython.noop),
+    ]
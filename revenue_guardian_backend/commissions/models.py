@@ -8,6 +8,10 @@ class CommissionStatement(models.Model):
     carrier = models.ForeignKey(Carrier, on_delete=models.CASCADE)
     statement_date = models.DateField()
     statement_file = models.FileField(upload_to='commission_statements/')
+    document = models.ForeignKey(
+        'documents.Document', on_delete=models.PROTECT, null=True, blank=True, related_name='statements',
+        help_text="Content-addressed copy of the statement file"
+    )
     
     # Reconciliation Status
     total_amount_paid = models.DecimalField(max_digits=12, decimal_places=2)
@@ -31,6 +35,10 @@ class CommissionTransaction(models.Model):
 
     statement = models.ForeignKey(CommissionStatement, on_delete=models.CASCADE, related_name='transactions')
     policy = models.ForeignKey(Policy, on_delete=models.SET_NULL, null=True, related_name='commissions')
+    # Set when the policy is moved to the archive (policies/archive.py)
+    archived_policy = models.ForeignKey(
+        'policies.ArchivedPolicy', on_delete=models.SET_NULL, null=True, blank=True, related_name='commissions'
+    )
     
     # The Math
     amount_expected = models.DecimalField(max_digits=10, decimal_places=2, help_text="Calculated by System")
@@ -42,13 +50,122 @@ class CommissionTransaction(models.Model):
     
     transaction_date = models.DateField()
 
-    def save(self, *args, **kwargs):
-        # Auto-calculate status before saving
-        diff = self.amount_received - self.amount_expected
+    # Statement versioning: identifies the line across re-issued statements
+    policy_number = models.CharField(max_length=100, blank=True, help_text="Policy number as printed by the Carrier")
+    line_key = models.CharField(max_length=40, blank=True)
+    fingerprint = models.CharField(max_length=40, blank=True, help_text="Hash of the line content")
+
+    class Meta:
+        indexes = [
+            # Discrepancy review: "all UNDERPAID lines on statement X"
+            models.Index(fields=['statement', 'status'], name='commission_statement_status'),
+            # Payment history for a policy, newest first
+            models.Index(fields=['policy', 'transaction_date'], name='commission_policy_date'),
+            # Back-office filters: "every UNDERPAID line this quarter"
+            models.Index(fields=['status', 'transaction_date'], name='commission_status_date'),
+        ]
+        constraints = [
+            # On PostgreSQL the table is range-partitioned by transaction_date
+            # (commissions/partitions.py), and a unique index there must include
+            # the partition key. line_key is already unique per upload
+            # (reconciliation.assign_keys), so this is no weaker in practice.
+            models.UniqueConstraint(
+                fields=['statement', 'line_key', 'transaction_date'],
+                condition=~models.Q(line_key=''),
+                name='unique_statement_line_key',
+            ),
+        ]
+
+    @staticmethod
+    def status_for(amount_expected, amount_received):
+        diff = amount_received - amount_expected
         if diff == 0:
-            self.status = 'MATCHED'
+            return 'MATCHED'
         elif diff < 0:
-            self.status = 'UNDERPAID'
-        else:
-            self.status = 'OVERPAID'
-        super().save(*args, **kwargs)
\ No newline at end of file
+            return 'UNDERPAID'
+        return 'OVERPAID'
+
+    def save(self, *args, **kwargs):
+        # Auto-calculate status before saving
+        self.status = self.status_for(self.amount_expected, self.amount_received)
+        super().save(*args, **kwargs)
+
+
+class StatementRevision(models.Model):
+    """
+    One uploaded version of a CommissionStatement.
+    Carriers re-issue corrected statements; each upload is diffed against
+    the current transactions and only the delta is written.
+    """
+    statement = models.ForeignKey(CommissionStatement, on_delete=models.CASCADE, related_name='revisions')
+    version = models.PositiveIntegerField()
+    document = models.ForeignKey(
+        'documents.Document', on_delete=models.PROTECT, null=True, blank=True, related_name='statement_revisions'
+    )
+
+    # What this upload changed
+    line_count = models.PositiveIntegerField(default=0)
+    inserted = models.PositiveIntegerField(default=0)
+    updated = models.PositiveIntegerField(default=0)
+    removed = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['statement', 'version']
+        constraints = [
+            models.UniqueConstraint(fields=['statement', 'version'], name='unique_statement_version'),
+        ]
+
+    def __str__(self):
+        return f"Statement {self.statement_id} v{self.version}"
+
+class CarrierPaymentStats(models.Model):
+    """
+    Running statistics of received/expected per Carrier x policy type.
+    Maintained incrementally (Welford / Chan) as statement lines are
+    ingested, so history never has to be re-scanned.
+    """
+    carrier = models.ForeignKey(Carrier, on_delete=models.CASCADE, related_name='payment_stats')
+    policy_type = models.CharField(max_length=20, choices=Policy.POLICY_TYPES)
+
+    count = models.BigIntegerField(default=0)
+    mean = models.FloatField(default=0.0)
+    m2 = models.FloatField(default=0.0, help_text="Sum of squared deviations from the mean")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['carrier', 'policy_type'], name='unique_carrier_policy_type_stats'),
+        ]
+
+    def __str__(self):
+        return f"{self.carrier_id} {self.policy_type}: n={self.count} mean={self.mean:.4f}"
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+
+class PaymentAnomaly(models.Model):
+    """
+    A statement whose payout ratio for a policy type drifted away from
+    the carrier's history.
+    """
+    statement = models.ForeignKey(CommissionStatement, on_delete=models.CASCADE, related_name='anomalies')
+    carrier = models.ForeignKey(Carrier, on_delete=models.CASCADE, related_name='payment_anomalies')
+    policy_type = models.CharField(max_length=20, choices=Policy.POLICY_TYPES)
+
+    line_count = models.PositiveIntegerField()
+    observed_ratio = models.FloatField(help_text="Mean received/expected on this statement")
+    baseline_ratio = models.FloatField(help_text="Historical mean before this statement")
+    baseline_std = models.FloatField()
+    z_score = models.FloatField()
+
+    acknowledged = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.carrier_id} {self.policy_type} z={self.z_score:.1f} (statement {self.statement_id})"
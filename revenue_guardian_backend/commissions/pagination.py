@@ -0,0 +1,31 @@
+from collections import OrderedDict
+
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+
+
+class DiscrepancyPagination(LimitOffsetPagination):
+    """
+    Limit/offset pagination that puts the aggregate summary ahead of the rows.
+    The row count comes from the summary query, so no second COUNT(*) is run.
+    """
+    default_limit = 100
+    max_limit = 1000
+
+    def paginate_queryset(self, queryset, request, view=None, summary=None):
+        self.summary = summary
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_count(self, queryset):
+        if self.summary is not None:
+            return self.summary['count']
+        return super().get_count(queryset)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('summary', self.summary),
+            ('count', self.count),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
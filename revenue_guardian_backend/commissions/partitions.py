@@ -0,0 +1,101 @@
+"""
+Monthly range partitions of CommissionTransaction on transaction_date.
+
+PostgreSQL only: migration 0009 turns the table into a partitioned parent
+with one partition per month plus a DEFAULT partition. Queries filtered
+by transaction_date (discrepancy reports, payment history) only touch
+the months they ask for, and each month's indexes stay small.
+roll_partitions creates months ahead of time so the DEFAULT partition
+stays empty.
+
+Other backends (SQLite in tests) keep a plain table and every function
+here is a no-op.
+"""
+from datetime import date
+
+TABLE = 'commissions_commissiontransaction'
+DEFAULT_PARTITION = f'{TABLE}_default'
+
+
+def is_partitioned(connection):
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass)", [TABLE])
+        return cursor.fetchone()[0]
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def add_months(month, n):
+    years, month_index = divmod(month.month - 1 + n, 12)
+    return date(month.year + years, month_index + 1, 1)
+
+
+def months_between(first, last):
+    month = month_start(first)
+    while month <= last:
+        yield month
+        month = add_months(month, 1)
+
+
+def partition_name(month):
+    return f"{TABLE}_{month:%Y_%m}"
+
+
+def existing_partitions(cursor):
+    cursor.execute(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = %s::regclass",
+        [TABLE],
+    )
+    return {row[0] for row in cursor.fetchall()}
+
+
+def create_partition(cursor, month):
+    """
+    Adds the partition for `month`. Rows for that month already sitting in
+    the DEFAULT partition are moved into it first (attaching would fail
+    otherwise). Indexes and foreign keys are cloned from the parent on attach.
+    """
+    name, end = partition_name(month), add_months(month, 1)
+    cursor.execute(f'CREATE TABLE "{name}" (LIKE "{TABLE}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+    cursor.execute(
+        f'WITH moved AS ('
+        f'  DELETE FROM "{DEFAULT_PARTITION}" WHERE transaction_date >= %s AND transaction_date < %s RETURNING *'
+        f') INSERT INTO "{name}" SELECT * FROM moved',
+        [month, end],
+    )
+    moved = cursor.rowcount
+    cursor.execute(f'ALTER TABLE "{TABLE}" ATTACH PARTITION "{name}" FOR VALUES FROM (%s) TO (%s)', [month, end])
+    return moved
+
+
+def ensure_partitions(connection, first, last):
+    """
+    Creates every missing monthly partition from `first` through `last`.
+    Returns [(partition name, rows moved out of DEFAULT)] for those created.
+    """
+    if not is_partitioned(connection):
+        return []
+    created = []
+    with connection.cursor() as cursor:
+        existing = existing_partitions(cursor)
+        for month in months_between(first, last):
+            if partition_name(month) not in existing:
+                created.append((partition_name(month), create_partition(cursor, month)))
+    return created
+
+
+def default_partition_rows(connection):
+    """
+    Rows outside every monthly partition (should be 0; they get no pruning).
+    """
+    if not is_partitioned(connection):
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT count(*) FROM "{DEFAULT_PARTITION}"')
+        return cursor.fetchone()[0]
@@ -0,0 +1,329 @@
+import hashlib
+from collections import Counter
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import Case, F, Max, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from rest_framework.exceptions import ValidationError
+
+from documents.models import Document
+from notifications.events import publish
+from policies.matching import PolicyMatchIndex, normalize_policy_number
+from policies.models import Policy
+from .analytics import record_payment_ratios
+from .models import CommissionStatement, CommissionTransaction, StatementRevision
+
+# CommissionTransaction.status_for() as a SQL expression
+STATUS_EXPRESSION = Case(
+    When(amount_received=F('amount_expected'), then=Value('MATCHED')),
+    When(amount_received__lt=F('amount_expected'), then=Value('UNDERPAID')),
+    default=Value('OVERPAID'),
+)
+
+# Rows per bulk INSERT / UPDATE / DELETE statement
+BATCH_SIZE = 1000
+
+CENTS = Decimal('0.01')
+
+# numeric(10, 2) holds amounts below 10**8
+AMOUNT_LIMIT = Decimal(10) ** (
+    CommissionTransaction._meta.get_field('amount_received').max_digits
+    - CommissionTransaction._meta.get_field('amount_received').decimal_places
+)
+
+
+def _sha1(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def _amount(value):
+    amount = Decimal(str(value)).quantize(CENTS)
+    # NaN / Infinity would fail in status_for(), huge values on INSERT
+    if not amount.is_finite() or abs(amount) >= AMOUNT_LIMIT:
+        raise ValueError(f"amount out of range: {value}")
+    return amount
+
+
+def parse_lines(raw_lines):
+    """
+    Validates the raw statement lines (list of dicts) and normalizes them.
+    Plain Python instead of a many=True serializer: a 200k line statement
+    would otherwise spend most of its time in DRF field machinery.
+    """
+    if not isinstance(raw_lines, list):
+        raise ValidationError({"lines": "Expected a list of statement lines."})
+
+    lines = []
+    for index, raw in enumerate(raw_lines):
+        try:
+            policy_number = str(raw['policy_number']).strip()
+            transaction_date = raw['transaction_date']
+            if not isinstance(transaction_date, date):
+                transaction_date = date.fromisoformat(transaction_date)
+            amount_expected = _amount(raw['amount_expected'])
+            amount_received = _amount(raw['amount_received'])
+        except (KeyError, TypeError, ValueError, InvalidOperation) as e:
+            raise ValidationError({"lines": f"Line {index + 1} is invalid: {e!r}"})
+
+        lines.append({
+            'line_ref': str(raw.get('line_ref') or ''),
+            'policy_number': policy_number,
+            'transaction_date': transaction_date,
+            'amount_expected': amount_expected,
+            'amount_received': amount_received,
+        })
+    return lines
+
+
+def assign_keys(lines):
+    """
+    Gives every line a stable identity (line_key) and a content hash (fingerprint).
+
+    The key is the carrier's own line reference when it prints one; otherwise
+    policy number + date + occurrence, so two identical payments on the same
+    day stay distinct lines.
+    """
+    occurrences = Counter()
+    for line in lines:
+        if line['line_ref']:
+            identity = f"ref|{line['line_ref']}"
+        else:
+            base = f"{line['policy_number']}|{line['transaction_date'].isoformat()}"
+            occurrences[base] += 1
+            identity = f"auto|{base}|{occurrences[base]}"
+        line['line_key'] = _sha1(identity)
+        line['fingerprint'] = _sha1(
+            f"{line['policy_number']}|{line['transaction_date'].isoformat()}|"
+            f"{line['amount_expected']}|{line['amount_received']}"
+        )
+
+    keys = [line['line_key'] for line in lines]
+    if len(set(keys)) != len(keys):
+        raise ValidationError({"lines": "Duplicate line_ref values in statement."})
+    return lines
+
+
+def _resolve_policies(carrier, policy_numbers):
+    """
+    Resolves printed policy numbers to the carrier's (Policy ID, policy type)
+    by normalized key (so "MET-00123" finds "123"), in batches of one query each.
+    Keys shared by more than one policy are ambiguous and left unmatched.
+    """
+    rules = carrier.policy_number_rules
+    keys = {number: normalize_policy_number(number, rules) for number in set(policy_numbers)}
+    unique_keys = list(set(keys.values()))
+
+    by_key = {}
+    for i in range(0, len(unique_keys), BATCH_SIZE):
+        rows = (
+            Policy.objects.filter(carrier=carrier, policy_number_key__in=unique_keys[i:i + BATCH_SIZE])
+            .values_list('policy_number_key', 'id', 'policy_type')
+        )
+        for key, policy_id, policy_type in rows:
+            by_key[key] = None if key in by_key else (policy_id, policy_type)
+
+    return {number: by_key.get(key) for number, key in keys.items() if by_key.get(key)}
+
+
+def match_candidates(statement, limit=5, min_score=0.5):
+    """
+    Ranked Policy candidates for every unmatched line of `statement`,
+    in one batched pass: two queries, then an in-memory blocking index.
+    Returns [{transaction, policy_number, candidates: [{policy, policy_number, score, reason}]}].
+    """
+    carrier = statement.carrier
+    rules = carrier.policy_number_rules
+    index = PolicyMatchIndex(
+        Policy.objects.filter(carrier=carrier)
+        .values_list('id', 'policy_number_key', 'prev_policy_number_key').iterator()
+    )
+
+    unmatched = statement.transactions.filter(policy__isnull=True).values_list('id', 'policy_number')
+    results, needed = [], set()
+    for transaction_id, policy_number in unmatched.iterator():
+        candidates = index.candidates(normalize_policy_number(policy_number, rules), limit, min_score)
+        needed.update(policy_id for policy_id, _, _ in candidates)
+        results.append((transaction_id, policy_number, candidates))
+
+    needed, numbers = list(needed), {}
+    for i in range(0, len(needed), BATCH_SIZE):
+        numbers.update(Policy.objects.filter(id__in=needed[i:i + BATCH_SIZE]).values_list('id', 'policy_number'))
+    return [
+        {
+            'transaction': transaction_id,
+            'policy_number': policy_number,
+            'candidates': [
+                {'policy': policy_id, 'policy_number': numbers[policy_id], 'score': score, 'reason': reason}
+                for policy_id, score, reason in candidates
+            ],
+        }
+        for transaction_id, policy_number, candidates in results
+    ]
+
+
+def _progress(user, statement, stage, **details):
+    # Reconciliation progress on the uploader's event stream (/api/events/)
+    if user is not None:
+        publish(user.pk, 'statement.progress', {'statement': statement.pk, 'stage': stage, **details})
+
+
+def apply_revision(statement, raw_lines, document=None, user=None):
+    """
+    Diffs an uploaded version of `statement` against its current transactions
+    and writes only the inserted, changed and removed lines.
+    Returns the new StatementRevision.
+    """
+    lines = assign_keys(parse_lines(raw_lines))
+    _progress(user, statement, 'started', line_count=len(lines))
+    try:
+        revision = _apply_lines(statement, lines, document, user)
+    except Exception:
+        _progress(user, statement, 'failed')
+        raise
+    return revision
+
+
+def _apply_lines(statement, lines, document, user):
+    with transaction.atomic():
+        # Serialize concurrent uploads for the same statement
+        statement = CommissionStatement.objects.select_for_update().get(pk=statement.pk)
+
+        # 1. Current state: one narrow query, no model instances
+        current, legacy = {}, []
+        for row in statement.transactions.values_list(
+            'line_key', 'id', 'fingerprint', 'amount_received', 'amount_expected', 'policy__policy_type'
+        ).iterator():
+            if row[0]:
+                current[row[0]] = row[1:]
+            else:
+                # Lines stored before line keys existed (migration 0004) cannot
+                # be matched to the upload; the new version replaces all of them
+                legacy.append(row[1:])
+
+        # 2. Diff
+        incoming_keys = set()
+        to_insert, to_update = [], []
+        withdrawn = []  # previous values of changed/removed lines, for the payout statistics
+        delta = Decimal('0.00')
+        for line in lines:
+            incoming_keys.add(line['line_key'])
+            existing = current.get(line['line_key'])
+            if existing is None:
+                to_insert.append(line)
+                delta += line['amount_received']
+            elif existing[1] != line['fingerprint']:
+                line['id'] = existing[0]
+                to_update.append(line)
+                withdrawn.append(existing)
+                delta += line['amount_received'] - existing[2]
+
+        removed_ids = []
+        stale = [existing for line_key, existing in current.items() if line_key not in incoming_keys]
+        for existing in stale + legacy:
+            removed_ids.append(existing[0])
+            withdrawn.append(existing)
+            delta -= existing[2]
+
+        # 3. Apply the delta
+        policies = _resolve_policies(statement.carrier, (line['policy_number'] for line in to_insert + to_update))
+
+        def build(line):
+            return CommissionTransaction(
+                id=line.get('id'),
+                statement=statement,
+                policy_id=policies.get(line['policy_number'], (None, None))[0],
+                policy_number=line['policy_number'],
+                line_key=line['line_key'],
+                fingerprint=line['fingerprint'],
+                amount_expected=line['amount_expected'],
+                amount_received=line['amount_received'],
+                # bulk_create / bulk_update skip save(), so compute status here
+                status=CommissionTransaction.status_for(line['amount_expected'], line['amount_received']),
+                transaction_date=line['transaction_date'],
+            )
+
+        CommissionTransaction.objects.bulk_create([build(line) for line in to_insert], batch_size=BATCH_SIZE)
+        CommissionTransaction.objects.bulk_update(
+            [build(line) for line in to_update],
+            ['policy', 'policy_number', 'fingerprint', 'amount_expected', 'amount_received',
+             'status', 'transaction_date'],
+            batch_size=BATCH_SIZE,
+        )
+        for i in range(0, len(removed_ids), BATCH_SIZE):
+            CommissionTransaction.objects.filter(id__in=removed_ids[i:i + BATCH_SIZE]).delete()
+
+        # 4. Downstream totals move by the delta, not by a full re-sum
+        old_document_id = statement.document_id
+        new_document_id = document.pk if document else old_document_id
+        CommissionStatement.objects.filter(pk=statement.pk).update(
+            total_amount_paid=F('total_amount_paid') + delta,
+            is_processed=True,
+            document_id=new_document_id,
+        )
+        Document.swap(old_document_id, new_document_id)
+        if document:
+            # The revision keeps its own reference to the file it came from
+            Document.swap(None, document.pk)
+
+        # 5. Carrier payout statistics move by the same delta
+        record_payment_ratios(
+            statement,
+            added=[
+                (policies.get(line['policy_number'], (None, None))[1], line['amount_expected'], line['amount_received'])
+                for line in to_insert + to_update
+            ],
+            removed=[
+                (policy_type, amount_expected, amount_received)
+                for _, _, amount_received, amount_expected, policy_type in withdrawn
+            ],
+        )
+
+        last_version = statement.revisions.aggregate(v=Max('version'))['v'] or 0
+        revision = StatementRevision.objects.create(
+            statement=statement,
+            version=last_version + 1,
+            document=document,
+            line_count=len(lines),
+            inserted=len(to_insert),
+            updated=len(to_update),
+            removed=len(removed_ids),
+        )
+        # Sent on commit
+        _progress(
+            user, statement, 'completed', version=revision.version,
+            inserted=revision.inserted, updated=revision.updated, removed=revision.removed,
+        )
+
+    return revision
+
+
+def rereconcile_transactions(transactions):
+    """
+    Recomputes the status of `transactions` from their amounts in ONE
+    UPDATE, touching only rows whose status is stale. Lines flagged
+    MISSING by hand are left alone. Returns the number of rows fixed.
+    """
+    return (
+        transactions.exclude(status='MISSING')
+        .alias(computed_status=STATUS_EXPRESSION)
+        .exclude(status=F('computed_status'))
+        .update(status=STATUS_EXPRESSION)
+    )
+
+
+def rereconcile_statements(statements):
+    """
+    Re-derives line statuses and total_amount_paid for `statements`:
+    two set-based UPDATEs, however many statements and lines.
+    Returns (lines fixed, statements updated).
+    """
+    with transaction.atomic():
+        fixed = rereconcile_transactions(CommissionTransaction.objects.filter(statement__in=statements))
+        paid = (
+            CommissionTransaction.objects.filter(statement=OuterRef('pk'))
+            .values('statement').annotate(total=Sum('amount_received')).values('total')
+        )
+        updated = statements.update(total_amount_paid=Coalesce(Subquery(paid), Value(Decimal('0.00'))))
+    return fixed, updated
@@ -0,0 +1,52 @@
+from decimal import Decimal
+
+from django.db.models import Count, Q, Sum
+
+from .models import CommissionTransaction
+
+DISCREPANCY_STATUSES = ['UNDERPAID', 'OVERPAID', 'MISSING']
+
+ZERO = Decimal('0.00')
+
+
+def discrepancy_summary(queryset, statuses):
+    """
+    Totals (expected, received, variance) overall and per status, computed
+    in ONE aggregate query using conditional aggregation.
+    """
+    aggregates = {
+        'count': Count('id'),
+        'expected': Sum('amount_expected'),
+        'received': Sum('amount_received'),
+    }
+    for status in statuses:
+        condition = Q(status=status)
+        aggregates[f'{status}_count'] = Count('id', filter=condition)
+        aggregates[f'{status}_expected'] = Sum('amount_expected', filter=condition)
+        aggregates[f'{status}_received'] = Sum('amount_received', filter=condition)
+
+    row = queryset.order_by().aggregate(**aggregates)
+
+    def totals(prefix=''):
+        expected = row[f'{prefix}expected'] or ZERO
+        received = row[f'{prefix}received'] or ZERO
+        return {
+            'count': row[f'{prefix}count'],
+            'total_expected': expected,
+            'total_received': received,
+            'variance': received - expected,
+        }
+
+    summary = totals()
+    summary['by_status'] = {status: totals(f'{status}_') for status in statuses}
+    return summary
+
+
+def parse_statuses(value):
+    """
+    '?status=UNDERPAID,MISSING' -> ['UNDERPAID', 'MISSING']. Defaults to every discrepancy status.
+    """
+    valid = {choice for choice, _ in CommissionTransaction.STATUS_CHOICES}
+    if not value:
+        return list(DISCREPANCY_STATUSES)
+    return [status for status in value.upper().split(',') if status in valid] or list(DISCREPANCY_STATUSES)
@@ -0,0 +1,72 @@
+from rest_framework import serializers
+from documents.serializers import AgentDocumentField
+from .models import CommissionStatement, CommissionTransaction, PaymentAnomaly, StatementRevision
+
+
+class CommissionStatementSerializer(serializers.ModelSerializer):
+    """
+    Serializer for a Carrier's commission statement.
+    Totals and processing state are maintained by reconciliation, never written directly.
+    """
+    carrier_name = serializers.CharField(source='carrier.name', read_only=True)
+    latest_version = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = CommissionStatement
+        fields = [
+            'id', 'carrier', 'carrier_name', 'statement_date', 'statement_file', 'document',
+            'total_amount_paid', 'is_processed', 'latest_version', 'created_at'
+        ]
+        read_only_fields = ['document', 'total_amount_paid', 'is_processed']
+        extra_kwargs = {'statement_file': {'required': False}}
+
+
+class StatementRevisionSerializer(serializers.ModelSerializer):
+    """
+    A new upload of a statement's lines.
+    `lines` is validated by commissions.reconciliation.parse_lines, which is
+    much cheaper than a nested many=True serializer on very large statements.
+    """
+    lines = serializers.JSONField(write_only=True)
+    document = AgentDocumentField(required=False, allow_null=True)
+
+    class Meta:
+        model = StatementRevision
+        fields = [
+            'id', 'statement', 'version', 'document', 'lines',
+            'line_count', 'inserted', 'updated', 'removed', 'created_at'
+        ]
+        read_only_fields = ['statement', 'version', 'line_count', 'inserted', 'updated', 'removed']
+
+
+class DiscrepancySerializer(serializers.ModelSerializer):
+    """
+    A single reconciled line. `variance` is annotated by the queryset (received - expected).
+    """
+    variance = serializers.DecimalField(max_digits=11, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = CommissionTransaction
+        fields = [
+            'id', 'statement', 'policy', 'policy_number', 'transaction_date',
+            'amount_expected', 'amount_received', 'variance', 'status', 'discrepancy_reason'
+        ]
+
+
+class PaymentAnomalySerializer(serializers.ModelSerializer):
+    """
+    Carrier payout drift alert. Only `acknowledged` is writable.
+    """
+    carrier_name = serializers.CharField(source='carrier.name', read_only=True)
+    statement_date = serializers.DateField(source='statement.statement_date', read_only=True)
+
+    class Meta:
+        model = PaymentAnomaly
+        fields = [
+            'id', 'statement', 'statement_date', 'carrier', 'carrier_name', 'policy_type', 'line_count',
+            'observed_ratio', 'baseline_ratio', 'baseline_std', 'z_score', 'acknowledged', 'created_at'
+        ]
+        read_only_fields = [
+            'statement', 'carrier', 'policy_type', 'line_count',
+            'observed_ratio', 'baseline_ratio', 'baseline_std', 'z_score'
+        ]
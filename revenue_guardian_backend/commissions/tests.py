@@ -1,3 +1,276 @@
-from django.test import TestCase
+import random
+import statistics
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from unittest import skipUnless
 
-# Create your tests here.
+from django.contrib.admin.widgets import ForeignKeyRawIdWidget
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APITestCase
+
+from policies.models import Carrier, Client, Policy
+from .analytics import RunningStats
+from .models import CarrierPaymentStats, CommissionStatement, CommissionTransaction, PaymentAnomaly
+from .partitions import default_partition_rows, partition_name
+from .reconciliation import apply_revision, parse_lines, rereconcile_statements
+
+User = get_user_model()
+
+
+def make_book(n_policies=5):
+    agent = User.objects.create_user(username='agent', password='pw')
+    carrier = Carrier.objects.create(name='MetLife')
+    client = Client.objects.create(agent=agent, name='Jane Doe', email='jane@example.com', phone='555', gender='F')
+    policies = [
+        Policy.objects.create(
+            client=client, carrier=carrier, policy_number=f"POL-{i:04d}", policy_type='LIFE',
+            premium_amount=1000, sum_insured=100000, start_date=date(2025, 1, 1),
+            end_date=date(2026, 1, 1), renewal_date=date(2026, 1, 1),
+        )
+        for i in range(n_policies)
+    ]
+    return agent, carrier, policies
+
+
+def line(policy_number, received, expected='100.00', day=15):
+    return {
+        'policy_number': policy_number,
+        'transaction_date': f"2025-06-{day:02d}",
+        'amount_expected': expected,
+        'amount_received': received,
+    }
+
+
+class StatementRevisionTests(TestCase):
+    def setUp(self):
+        self.agent, self.carrier, self.policies = make_book()
+        self.statement = CommissionStatement.objects.create(
+            carrier=self.carrier, statement_date=date(2025, 6, 30), total_amount_paid=0
+        )
+        self.v1 = [line(p.policy_number, '100.00') for p in self.policies]
+
+    def test_first_upload_inserts_every_line(self):
+        revision = apply_revision(self.statement, self.v1)
+
+        self.statement.refresh_from_db()
+        self.assertEqual((revision.version, revision.inserted), (1, 5))
+        self.assertEqual(self.statement.total_amount_paid, Decimal('500.00'))
+        self.assertTrue(self.statement.is_processed)
+
+    def test_reissue_applies_only_the_delta(self):
+        apply_revision(self.statement, self.v1)
+        untouched_ids = set(self.statement.transactions.values_list('id', flat=True))
+
+        v2 = list(self.v1)
+        v2[0] = line('POL-0000', '80.00')      # corrected amount
+        del v2[1]                              # line withdrawn
+        v2.append(line('POL-0002', '25.00', day=20))  # extra payment
+        revision = apply_revision(self.statement, v2)
+
+        self.statement.refresh_from_db()
+        self.assertEqual((revision.version, revision.inserted, revision.updated, revision.removed), (2, 1, 1, 1))
+        self.assertEqual(self.statement.total_amount_paid, Decimal('405.00'))
+        self.assertEqual(self.statement.transactions.get(policy_number='POL-0000').status, 'UNDERPAID')
+        # Unchanged lines keep their rows
+        self.assertEqual(len(untouched_ids & set(self.statement.transactions.values_list('id', flat=True))), 4)
+
+    def test_identical_reissue_writes_nothing(self):
+        apply_revision(self.statement, self.v1)
+
+        revision = apply_revision(self.statement, self.v1)
+
+        self.assertEqual((revision.inserted, revision.updated, revision.removed), (0, 0, 0))
+
+    def test_lines_without_a_key_are_replaced(self):
+        # Rows written before migration 0004 all have line_key=''
+        for policy in self.policies[:3]:
+            CommissionTransaction.objects.create(
+                statement=self.statement, policy=policy, amount_expected=Decimal('100.00'), amount_received=Decimal('100.00'),
+                transaction_date=date(2025, 6, 15),
+            )
+        CommissionStatement.objects.filter(pk=self.statement.pk).update(total_amount_paid=300)
+
+        revision = apply_revision(self.statement, self.v1)
+
+        self.statement.refresh_from_db()
+        self.assertEqual((revision.inserted, revision.removed), (5, 3))
+        self.assertFalse(self.statement.transactions.filter(line_key='').exists())
+        self.assertEqual(self.statement.total_amount_paid, Decimal('500.00'))
+
+    def test_lines_match_policies_by_normalized_number(self):
+        self.carrier.policy_number_rules = {'strip_prefixes': ['MET']}
+        self.carrier.save()
+
+        apply_revision(self.statement, [line('MET pol 00003', '100.00')])
+
+        self.assertEqual(self.statement.transactions.get().policy, self.policies[3])
+
+
+class ParseLinesTests(SimpleTestCase):
+    def test_non_finite_and_oversized_amounts_are_rejected(self):
+        for amount in ('NaN', 'Infinity', '-inf', '1e20', '100000000.00'):
+            with self.subTest(amount=amount), self.assertRaisesMessage(ValidationError, 'Line 2 is invalid'):
+                parse_lines([line('POL-1', '10.00'), line('POL-2', amount)])
+
+        self.assertEqual(parse_lines([line('POL-1', '99999999.99')])[0]['amount_received'], Decimal('99999999.99'))
+
+
+class DiscrepancyApiTests(APITestCase):
+    def setUp(self):
+        self.agent, self.carrier, self.policies = make_book()
+        self.statement = CommissionStatement.objects.create(
+            carrier=self.carrier, statement_date=date(2025, 6, 30), total_amount_paid=0
+        )
+        apply_revision(self.statement, [
+            line('POL-0000', '100.00'),
+            line('POL-0001', '60.00'),
+            line('POL-0002', '90.00'),
+            line('POL-0003', '130.00'),
+        ])
+        self.client.force_authenticate(self.agent)
+
+    def test_summary_precedes_rows(self):
+        response = self.client.get(f"/api/commissions/statements/{self.statement.pk}/discrepancies/")
+
+        body = response.json()
+        self.assertEqual(list(body)[0], 'summary')
+        self.assertEqual(body['summary']['count'], 3)
+        self.assertEqual(Decimal(body['summary']['variance']), Decimal('-20.00'))
+        self.assertEqual(body['summary']['by_status']['UNDERPAID']['count'], 2)
+        self.assertEqual(len(body['results']), 3)
+
+    def test_agents_cannot_review_another_agents_book(self):
+        other = User.objects.create_user(username='other', password='pw')
+
+        response = self.client.get(f"/api/commissions/agents/{other.pk}/discrepancies/")
+
+        self.assertEqual(response.status_code, 403)
+
+
+class RunningStatsTests(SimpleTestCase):
+    def test_add_remove_and_merge_match_batch_statistics(self):
+        values = [0.97, 1.0, 1.02, 0.99, 1.05, 0.9]
+        stats = RunningStats()
+        for value in values + [1.5]:
+            stats.add(value)
+        stats.remove(1.5)
+
+        other = RunningStats()
+        for value in [1.1, 1.2]:
+            other.add(value)
+        stats.merge(other)
+
+        expected = values + [1.1, 1.2]
+        self.assertAlmostEqual(stats.mean, statistics.mean(expected))
+        self.assertAlmostEqual(stats.variance, statistics.variance(expected))
+
+
+class PaymentAnomalyTests(TestCase):
+    """
+    Synthetic statements: a stable carrier paying ~100% of expected,
+    then one statement with a 7% shortfall injected.
+    """
+    def setUp(self):
+        self.agent, self.carrier, self.policies = make_book(n_policies=20)
+        self.rng = random.Random(42)
+
+    def ingest(self, month, ratio):
+        statement = CommissionStatement.objects.create(
+            carrier=self.carrier, statement_date=date(2025, month, 28), total_amount_paid=0
+        )
+        lines = [
+            line(p.policy_number, f"{100 * self.rng.gauss(ratio, 0.01):.2f}", day=month)
+            for p in self.policies
+        ]
+        apply_revision(statement, lines)
+        return statement
+
+    def test_injected_drift_is_flagged(self):
+        for month in range(1, 7):
+            self.ingest(month, 1.0)
+        self.assertFalse(PaymentAnomaly.objects.exists())
+
+        drifted = self.ingest(7, 0.93)
+
+        anomaly = PaymentAnomaly.objects.get()
+        self.assertEqual((anomaly.statement, anomaly.policy_type), (drifted, 'LIFE'))
+        self.assertLess(anomaly.z_score, -4)
+        self.assertEqual(CarrierPaymentStats.objects.get().count, 140)
+
+    def test_corrections_replace_their_old_values_in_the_statistics(self):
+        statement = self.ingest(1, 1.0)
+        lines = [line(p.policy_number, '100.00', day=1) for p in self.policies]
+
+        apply_revision(statement, lines)
+
+        stats = CarrierPaymentStats.objects.get()
+        self.assertEqual(stats.count, 20)
+        self.assertAlmostEqual(stats.mean, 1.0)
+
+
+class CommissionAdminTests(TestCase):
+    def setUp(self):
+        self.agent, self.carrier, self.policies = make_book()
+        self.statement = CommissionStatement.objects.create(
+            carrier=self.carrier, statement_date=date(2025, 6, 30), total_amount_paid=0
+        )
+        apply_revision(self.statement, [line(p.policy_number, '90.00') for p in self.policies])
+        admin_user = User.objects.create_superuser(username='admin', password='pw')
+        self.client.force_login(admin_user)
+
+    def test_changelist_query_count_does_not_grow_with_rows(self):
+        url = '/admin/commissions/commissiontransaction/'
+        with CaptureQueriesContext(connection) as few_rows:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        apply_revision(self.statement, [line(f"NEW-{i}", '90.00') for i in range(20)])
+        with self.assertNumQueries(len(few_rows)):
+            self.client.get(url)
+
+    def test_change_form_does_not_list_every_archived_policy(self):
+        line = self.statement.transactions.first()
+        response = self.client.get(f'/admin/commissions/commissiontransaction/{line.pk}/change/')
+
+        widget = response.context['adminform'].form.fields['archived_policy'].widget
+        self.assertIsInstance(widget, ForeignKeyRawIdWidget)
+
+    def test_rereconcile_fixes_stale_statuses_and_totals(self):
+        # Edited behind reconciliation's back
+        CommissionTransaction.objects.filter(statement=self.statement).update(status='MATCHED')
+        CommissionStatement.objects.filter(pk=self.statement.pk).update(total_amount_paid=0)
+
+        fixed, updated = rereconcile_statements(CommissionStatement.objects.filter(pk=self.statement.pk))
+
+        self.assertEqual((fixed, updated), (5, 1))
+        self.assertEqual(set(self.statement.transactions.values_list('status', flat=True)), {'UNDERPAID'})
+        self.statement.refresh_from_db()
+        self.assertEqual(self.statement.total_amount_paid, Decimal('450.00'))
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Commission lines are only partitioned on PostgreSQL')
+class CommissionPartitionTests(TransactionTestCase):
+    # TransactionTestCase: ATTACH PARTITION refuses to run next to pending deferred FK checks
+
+    def test_rolling_back_in_time_moves_lines_out_of_default(self):
+        agent, carrier, policies = make_book()
+        statement = CommissionStatement.objects.create(
+            carrier=carrier, statement_date=date(2020, 6, 30), total_amount_paid=0
+        )
+        apply_revision(statement, [
+            {**line(p.policy_number, '100.00'), 'transaction_date': '2020-06-15'} for p in policies
+        ])
+        self.assertEqual(default_partition_rows(connection), 5)
+
+        call_command('roll_partitions', '--from', '2020-06-01', stdout=StringIO())
+
+        self.assertEqual(default_partition_rows(connection), 0)
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT count(*) FROM "{partition_name(date(2020, 6, 1))}"')
+            self.assertEqual(cursor.fetchone()[0], 5)
+        # Still one logical table
+        self.assertEqual(statement.transactions.filter(transaction_date__month=6).count(), 5)
@@ -0,0 +1,24 @@
+from django.urls import path
+from .views import (
+    StatementListCreateView, StatementDetailView, StatementRevisionListCreateView,
+    StatementMatchCandidatesView,
+    StatementDiscrepancyView, CarrierDiscrepancyView, AgentDiscrepancyView,
+    PaymentAnomalyListView, PaymentAnomalyDetailView,
+)
+
+urlpatterns = [
+    # Statements
+    path('statements/', StatementListCreateView.as_view(), name='statement-list-create'),
+    path('statements/<int:pk>/', StatementDetailView.as_view(), name='statement-detail'),
+    path('statements/<int:pk>/revisions/', StatementRevisionListCreateView.as_view(), name='statement-revisions'),
+    path('statements/<int:pk>/match-candidates/', StatementMatchCandidatesView.as_view(), name='statement-match-candidates'),
+
+    # Discrepancy review (summary + paginated lines)
+    path('statements/<int:pk>/discrepancies/', StatementDiscrepancyView.as_view(), name='statement-discrepancies'),
+    path('carriers/<int:pk>/discrepancies/', CarrierDiscrepancyView.as_view(), name='carrier-discrepancies'),
+    path('agents/<int:pk>/discrepancies/', AgentDiscrepancyView.as_view(), name='agent-discrepancies'),
+
+    # Carrier payout drift alerts
+    path('anomalies/', PaymentAnomalyListView.as_view(), name='payment-anomaly-list'),
+    path('anomalies/<int:pk>/', PaymentAnomalyDetailView.as_view(), name='payment-anomaly-detail'),
+]
@@ -1,3 +1,189 @@
-from django.shortcuts import render
+from django.db.models import DecimalField, ExpressionWrapper, F, Max, Q
+from django.shortcuts import get_object_or_404
+from django.utils.dateparse import parse_date
+from rest_framework import generics, permissions
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.response import Response
+from policies.archive import include_history
+from users.permissions import IsAgencyAdmin
+from .models import CommissionStatement, CommissionTransaction, PaymentAnomaly, StatementRevision
+from .pagination import DiscrepancyPagination
+from .reconciliation import apply_revision, match_candidates
+from .reports import discrepancy_summary, parse_statuses
+from .serializers import (
+    CommissionStatementSerializer, DiscrepancySerializer, PaymentAnomalySerializer, StatementRevisionSerializer,
+)
 
-# Create your views here.
+
+# --- Statement Views ---
+class StatementListCreateView(generics.ListCreateAPIView):
+    serializer_class = CommissionStatementSerializer
+    permission_classes = [permissions.IsAuthenticated, IsAgencyAdmin]
+
+    def get_queryset(self):
+        return (
+            CommissionStatement.objects.select_related('carrier')
+            .annotate(latest_version=Max('revisions__version'))
+            .order_by('-statement_date', '-id')
+        )
+
+    def perform_create(self, serializer):
+        # Totals start at zero and are built up by the first revision
+        serializer.save(total_amount_paid=0)
+
+
+class StatementDetailView(generics.RetrieveAPIView):
+    serializer_class = CommissionStatementSerializer
+    permission_classes = [permissions.IsAuthenticated, IsAgencyAdmin]
+
+    def get_queryset(self):
+        return CommissionStatement.objects.select_related('carrier').annotate(latest_version=Max('revisions__version'))
+
+
+class StatementRevisionListCreateView(generics.ListCreateAPIView):
+    """
+    GET: Version history of a statement.
+    POST: Upload a (corrected) version. Only the changed lines are written.
+    """
+    serializer_class = StatementRevisionSerializer
+    permission_classes = [permissions.IsAuthenticated, IsAgencyAdmin]
+
+    def get_statement(self):
+        return get_object_or_404(CommissionStatement, pk=self.kwargs['pk'])
+
+    def get_queryset(self):
+        return StatementRevision.objects.filter(statement_id=self.kwargs['pk'])
+
+    def perform_create(self, serializer):
+        serializer.instance = apply_revision(
+            self.get_statement(),
+            serializer.validated_data['lines'],
+            document=serializer.validated_data.get('document'),
+            user=self.request.user,
+        )
+
+
+class StatementMatchCandidatesView(generics.GenericAPIView):
+    """
+    Ranked policy suggestions for the statement's unmatched lines
+    (carrier prefixes, dashes, zero padding, truncation).
+    ?limit=5&min_score=0.5
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAgencyAdmin]
+
+    def get(self, request, pk):
+        statement = get_object_or_404(CommissionStatement.objects.select_related('carrier'), pk=pk)
+        try:
+            limit = min(int(request.query_params.get('limit', 5)), 20)
+            min_score = float(request.query_params.get('min_score', 0.5))
+        except ValueError:
+            raise ValidationError("limit and min_score must be numbers.")
+        return Response({'lines': match_candidates(statement, limit=limit, min_score=min_score)})
+
+
+# --- Discrepancy Review Views ---
+class DiscrepancyListView(generics.ListAPIView):
+    """
+    Base view: summary totals first (one aggregate query), then paginated lines.
+
+    Query params:
+      ?status=UNDERPAID,OVERPAID   (default: all discrepancy statuses)
+      ?date_from=YYYY-MM-DD&date_to=YYYY-MM-DD
+      ?summary_only=true           (skip the detail rows entirely)
+      ?include_history=true        (agents: also lines of their archived policies)
+    """
+    serializer_class = DiscrepancySerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = DiscrepancyPagination
+
+    def scope(self, queryset):
+        raise NotImplementedError
+
+    def owned_by(self, agent_id):
+        condition = Q(policy__client__agent_id=agent_id)
+        if include_history(self.request):
+            condition |= Q(archived_policy__client__agent_id=agent_id)
+        return condition
+
+    def get_queryset(self):
+        queryset = self.scope(CommissionTransaction.objects.all())
+
+        # SECURITY: Agents only see lines for their own clients' policies
+        if not self.request.user.is_agency_admin:
+            queryset = queryset.filter(self.owned_by(self.request.user.pk))
+
+        self.statuses = parse_statuses(self.request.query_params.get('status'))
+        queryset = queryset.filter(status__in=self.statuses)
+
+        for param, lookup in (('date_from', 'transaction_date__gte'), ('date_to', 'transaction_date__lte')):
+            value = self.request.query_params.get(param)
+            if value:
+                parsed = parse_date(value)
+                if parsed is None:
+                    raise ValidationError({param: "Use YYYY-MM-DD."})
+                queryset = queryset.filter(**{lookup: parsed})
+
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        summary = discrepancy_summary(queryset, self.statuses)
+
+        if request.query_params.get('summary_only') == 'true':
+            return Response({'summary': summary})
+
+        rows = queryset.annotate(
+            variance=ExpressionWrapper(
+                F('amount_received') - F('amount_expected'),
+                output_field=DecimalField(max_digits=11, decimal_places=2),
+            )
+        ).order_by('id')
+        page = self.paginator.paginate_queryset(rows, request, view=self, summary=summary)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+
+class StatementDiscrepancyView(DiscrepancyListView):
+    def scope(self, queryset):
+        return queryset.filter(statement_id=self.kwargs['pk'])
+
+
+class CarrierDiscrepancyView(DiscrepancyListView):
+    def scope(self, queryset):
+        return queryset.filter(statement__carrier_id=self.kwargs['pk'])
+
+
+class AgentDiscrepancyView(DiscrepancyListView):
+    def scope(self, queryset):
+        # SECURITY: Agents can only review their own book
+        if not self.request.user.is_agency_admin and self.kwargs['pk'] != self.request.user.pk:
+            raise PermissionDenied("You can only review your own discrepancies.")
+        return queryset.filter(self.owned_by(self.kwargs['pk']))
+
+
+# --- Payment Anomaly Views ---
+class PaymentAnomalyListView(generics.ListAPIView):
+    """
+    Carrier payout drift alerts, newest first.
+    ?carrier=<id>&acknowledged=false
+    """
+    serializer_class = PaymentAnomalySerializer
+    permission_classes = [permissions.IsAuthenticated, IsAgencyAdmin]
+
+    def get_queryset(self):
+        queryset = PaymentAnomaly.objects.select_related('carrier', 'statement')
+        carrier = self.request.query_params.get('carrier')
+        if carrier:
+            queryset = queryset.filter(carrier_id=carrier)
+        acknowledged = self.request.query_params.get('acknowledged')
+        if acknowledged in ('true', 'false'):
+            queryset = queryset.filter(acknowledged=acknowledged == 'true')
+        return queryset
+
+
+class PaymentAnomalyDetailView(generics.RetrieveUpdateAPIView):
+    """
+    PATCH {"acknowledged": true} once the carrier has been chased.
+    """
+    serializer_class = PaymentAnomalySerializer
+    permission_classes = [permissions.IsAuthenticated, IsAgencyAdmin]
+    queryset = PaymentAnomaly.objects.select_related('carrier', 'statement')
@@ -0,0 +1,133 @@
+import gzip
+import re
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# RFC 9110 qvalues only: a malformed entry ("gzip;q=.") is ignored, not a 500
+ENCODING_RE = re.compile(r'^\s*([a-z*]+)\s*(?:;\s*q\s*=\s*(0(?:\.[0-9]{0,3})?|1(?:\.0{0,3})?))?\s*$', re.I)
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/msgpack', 'text/')
+# Compressors buffer; an event stream must reach the browser frame by frame
+NEVER_COMPRESS_TYPES = ('text/event-stream',)
+
+
+def choose_encoding(accept_encoding):
+    """
+    Picks 'br' or 'gzip' from an Accept-Encoding header, honouring q-values.
+    Brotli wins ties: it is smaller for the same CPU on JSON.
+    """
+    offered = {}
+    for part in accept_encoding.split(','):
+        match = ENCODING_RE.match(part)
+        if match:
+            offered[match.group(1).lower()] = float(match.group(2) or 1)
+
+    candidates = ['br', 'gzip'] if brotli else ['gzip']
+    ranked = sorted(
+        (offered.get(name, offered.get('*', 0)), -i, name) for i, name in enumerate(candidates)
+    )
+    quality, _, name = ranked[-1]
+    return name if quality > 0 else None
+
+
+def _compressor(encoding):
+    if encoding == 'br':
+        return brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+    # wbits=31: zlib stream wrapped in a gzip header/trailer
+    return zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+
+def _compress_stream(chunks, encoding):
+    compressor = _compressor(encoding)
+    process = compressor.process if encoding == 'br' else compressor.compress
+    for chunk in chunks:
+        data = process(chunk)
+        if data:
+            yield data
+    yield compressor.finish() if encoding == 'br' else compressor.flush()
+
+
+async def _acompress_stream(chunks, encoding):
+    compressor = _compressor(encoding)
+    process = compressor.process if encoding == 'br' else compressor.compress
+    async for chunk in chunks:
+        data = process(chunk)
+        if data:
+            yield data
+    yield compressor.finish() if encoding == 'br' else compressor.flush()
+
+
+class CompressionMiddleware:
+    """
+    Negotiated brotli/gzip for API responses.
+
+    - Plain responses are only compressed above COMPRESSION_MIN_SIZE bytes;
+      below that the CPU costs more than the bytes saved.
+    - Streaming responses (large lists) are compressed chunk by chunk, so
+      nothing is buffered.
+    - Range responses, event streams and already-encoded or binary
+      documents are left alone.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        content_type = response.get('Content-Type', '')
+        if (
+            response.status_code != 200
+            or response.has_header('Content-Encoding')
+            or response.has_header('Content-Range')
+            or not content_type.startswith(COMPRESSIBLE_TYPES)
+            or content_type.startswith(NEVER_COMPRESS_TYPES)
+        ):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.headers.get('Accept-Encoding', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = _acompress_stream(response.streaming_content, encoding)
+            else:
+                response.streaming_content = _compress_stream(response.streaming_content, encoding)
+            del response['Content-Length']
+        else:
+            if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+                return response
+            if encoding == 'br':
+                compressed = brotli.compress(response.content, quality=settings.COMPRESSION_BROTLI_QUALITY)
+            else:
+                compressed = gzip.compress(response.content, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        # The compressed body differs byte-wise, so a strong ETag must be weakened
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,175 @@
+"""
+Primary / read-replica routing.
+
+- Writes, migrations and anything inside a transaction go to 'default'.
+- Reads from safe (GET/HEAD/OPTIONS) requests go to a healthy replica,
+  unless the same agent wrote something in the last REPLICA_PIN_SECONDS
+  (read-your-writes).
+- Code outside a request (commands, shell) reads from the primary unless
+  it opts in with `with reporting():`.
+"""
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.utils.connection import ConnectionDoesNotExist
+from django.utils.functional import SimpleLazyObject, empty
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# app_label of DatabaseCache's table model
+CACHE_APP_LABEL = 'django_cache'
+
+_current_request = ContextVar('db_router_request', default=None)
+_forced_alias = ContextVar('db_router_forced_alias', default=None)
+
+# alias -> (checked_at, healthy); per process
+_health = {}
+
+
+def _pin_key(user_id):
+    return f"db:pin-primary:{user_id}"
+
+
+def _user_id(request):
+    # Never force a lazy session user here: loading it would itself be a
+    # routed read. DRF replaces request.user with the real user once
+    # authentication has run.
+    user = request.__dict__.get('user')
+    if isinstance(user, SimpleLazyObject) and user._wrapped is empty:
+        return None
+    return getattr(user, 'pk', None)
+
+
+def pin_to_primary(user_id):
+    if user_id is not None:
+        cache.set(_pin_key(user_id), True, timeout=settings.REPLICA_PIN_SECONDS)
+
+
+def is_healthy(alias):
+    """
+    Cheap, cached liveness check: at most one connection attempt per
+    alias every REPLICA_HEALTH_CHECK_SECONDS.
+    """
+    checked_at, healthy = _health.get(alias, (0.0, True))
+    if time.monotonic() - checked_at < settings.REPLICA_HEALTH_CHECK_SECONDS:
+        return healthy
+    try:
+        connections[alias].ensure_connection()
+        healthy = True
+    except (DatabaseError, ConnectionDoesNotExist):
+        healthy = False
+    _health[alias] = (time.monotonic(), healthy)
+    return healthy
+
+
+@contextmanager
+def reporting():
+    """
+    Route reads in this block to a replica, e.g. exports and analytics commands.
+    """
+    token = _forced_alias.set('replica')
+    try:
+        yield
+    finally:
+        _forced_alias.reset(token)
+
+
+@contextmanager
+def primary():
+    """
+    Route reads in this block to the primary.
+    """
+    token = _forced_alias.set(DEFAULT_DB_ALIAS)
+    try:
+        yield
+    finally:
+        _forced_alias.reset(token)
+
+
+class PrimaryReplicaRouter:
+    def _wants_replica(self):
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return False
+
+        forced = _forced_alias.get()
+        if forced is not None:
+            return forced == 'replica'
+
+        request = _current_request.get()
+        if request is None or request.method not in SAFE_METHODS:
+            return False
+
+        user_id = _user_id(request)
+        if user_id is None:
+            return True
+        # One cache lookup per request, not per query
+        pinned = request.__dict__.get('_db_pinned_to_primary')
+        if pinned is None:
+            pinned = request._db_pinned_to_primary = bool(cache.get(_pin_key(user_id)))
+        return not pinned
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if model._meta.app_label == CACHE_APP_LABEL:
+            # DatabaseCache: a lagging replica would hide fresh pins and book versions
+            return DEFAULT_DB_ALIAS
+        if not replicas or not self._wants_replica():
+            return DEFAULT_DB_ALIAS
+        healthy = [alias for alias in replicas if is_healthy(alias)]
+        return random.choice(healthy) if healthy else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every alias holds the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Exposes the current request to the router, and pins an agent to the
+    primary for a short window after a successful write.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _current_request.set(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_request.reset(token)
+
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_to_primary(_user_id(request))
+        return response
+
+    async def __acall__(self, request):
+        # ASGI: sync views and ORM calls run in threads that inherit this context
+        token = _current_request.set(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_request.reset(token)
+
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            await sync_to_async(pin_to_primary)(_user_id(request))
+        return response
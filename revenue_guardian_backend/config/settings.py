@@ -48,15 +48,19 @@ INSTALLED_APPS = [
     'users',
     'policies',
     'commissions',
+    'documents',
+    'notifications',
 ]
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'config.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'config.db_router.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -92,9 +96,41 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
         'PORT': os.getenv('DB_PORT'),
+        # Persistent connections, re-validated before reuse after each request
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Read replicas: comma-separated hosts, e.g. DB_REPLICA_HOSTS=replica1,replica2
+# (point one at the primary's host to try the routing locally with two aliases).
+# Same credentials as the primary. Safe-method reads go to a replica; see config/db_router.py.
+DATABASE_REPLICAS = []
+for index, host in enumerate(filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(',')), start=1):
+    alias = f'replica_{index}'
+    DATABASES[alias] = {**DATABASES['default'], 'HOST': host.strip(), 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['config.db_router.PrimaryReplicaRouter']
+
+# Shared by every web worker and cron process: forecast book versions
+# (policies/cache.py) and replica pins (config/db_router.py) written by one
+# process must be seen by all of them, which a per-process LocMemCache is not.
+# Redis when REDIS_URL is set (needs `pip install redis`), otherwise a table in
+# the primary database (create it once: `python manage.py createcachetable`).
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': os.getenv('REDIS_URL')}
+    }
+else:
+    CACHES = {
+        'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'django_cache'}
+    }
+
+# After a write, the agent reads from the primary for this long (replica lag cover).
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', '5'))
+REPLICA_HEALTH_CHECK_SECONDS = 10
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -132,6 +168,15 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Uploaded files (Policy documents, Commission statements)
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Resumable uploads: chunks are appended here until the file is complete
+UPLOAD_TEMP_DIR = MEDIA_ROOT / 'uploads_tmp'
+UPLOAD_MAX_CHUNK_SIZE = 8 * 1024 * 1024   # 8 MB per PUT
+DOCUMENT_MAX_SIZE = 500 * 1024 * 1024     # 500 MB per file
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -146,8 +191,42 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated', # Lock everything by default
     ),
+    # JSON by default; MessagePack with `Accept: application/msgpack` or ?format=msgpack
+    'DEFAULT_RENDERER_CLASSES': (
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'config.renderers.MessagePackRenderer',
+    ),
 }
 
+# Response compression (config/compression.py): brotli or gzip, negotiated
+# from Accept-Encoding. Smaller bodies are sent as-is.
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 4  # 11 is for static assets; too slow per request
+
+# List views stream their JSON above this many rows (config/streaming.py)
+STREAMING_LIST_THRESHOLD = 1000
+STREAMING_LIST_CHUNK_SIZE = 500
+
+# Commission lines are range-partitioned by month on PostgreSQL (commissions/partitions.py)
+COMMISSION_PARTITION_MONTHS_AHEAD = 3
+
+# Lapsed/cancelled policies move to the archive this long after their end date (policies/archive.py)
+POLICY_ARCHIVE_AFTER_DAYS = 730
+
+# Admin changelists count exactly below this many (estimated) rows (config/admin.py)
+ADMIN_EXACT_COUNT_LIMIT = 10000
+
+# Server-sent events (/api/events/, notifications app). Serve with an ASGI
+# server (e.g. `uvicorn config.asgi:application`) so idle streams are cheap.
+# Downloads and large lists stay chunked under ASGI (config.streaming.streaming_content).
+SSE_TICKET_SECONDS = 60           # Lifetime of a stream ticket (checked on connect only)
+SSE_POLL_SECONDS = 2              # Pick-up delay for events from other processes
+SSE_HEARTBEAT_SECONDS = 25        # Comment line that keeps proxies from closing idle streams
+SSE_RETRY_MILLISECONDS = 3000     # Browser reconnect delay
+SSE_BATCH_SIZE = 100
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60), # Token expires in 1 hour
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),    # Login lasts 1 day
@@ -158,6 +237,24 @@ SIMPLE_JWT = {
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 EMAIL_FROM_ADDRESS = 'noreply@revenueguardian.com'
 
+# Revenue forecast: expected commission as a share of premium, per policy type
+COMMISSION_RATES = {
+    'LIFE': 0.10,
+    'HEALTH': 0.08,
+    'AUTO': 0.12,
+    'HOME': 0.12,
+}
+FORECAST_CACHE_SECONDS = 60 * 60 * 24
+
+# Carrier payout drift alerts (commissions/analytics.py)
+PAYMENT_ANOMALY = {
+    'Z_THRESHOLD': 4.0,        # Std-errors between statement mean and history
+    'MIN_RATIO_SHIFT': 0.02,   # ...and at least a 2% shift in received/expected
+    'MIN_HISTORY': 30,         # Lines of history before alerting
+    'MIN_LINES': 5,            # Lines on the statement before alerting
+    'MIN_STD': 0.01,           # Floor for perfectly consistent carriers
+}
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
     "http://127.0.0.1:5173",
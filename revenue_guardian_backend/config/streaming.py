@@ -0,0 +1,90 @@
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+
+async def _aiterate(chunks):
+    # Each next() runs on the thread that owns the request's DB connection
+    chunks = iter(chunks)
+    done = object()
+    while (chunk := await sync_to_async(next)(chunks, done)) is not done:
+        yield chunk
+
+
+def streaming_content(request, chunks):
+    """
+    Body iterator for a StreamingHttpResponse that stays chunked on both servers.
+
+    Under ASGI, Django drains a *sync* iterator with sync_to_async(list)
+    before sending a byte, i.e. the whole file or list is buffered. There
+    the chunks are handed over as an async iterator instead, one thread
+    hop per chunk. Under WSGI the plain iterator is returned unchanged.
+    """
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        return _aiterate(chunks)
+    return chunks
+
+
+class StreamingListMixin:
+    """
+    For unpaginated list views that can return a whole book.
+
+    Up to STREAMING_LIST_THRESHOLD rows are rendered as usual. Bigger lists
+    are streamed as a JSON array, STREAMING_LIST_CHUNK_SIZE rows at a time,
+    so the server never holds the full queryset, serializer output and
+    rendered body in memory at once (and compression can start on the
+    first chunk). Other formats (MessagePack, browsable API) are rendered
+    in one piece.
+
+    Views can override `prepare_chunk(objects)` to bulk-load data the
+    serializer needs for each chunk.
+    """
+
+    def prepare_chunk(self, objects):
+        pass
+
+    def serialize_chunk(self, objects):
+        self.prepare_chunk(objects)
+        return self.get_serializer(objects, many=True).data
+
+    def list(self, request, *args, **kwargs):
+        if self.paginator is not None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if type(request.accepted_renderer) is not JSONRenderer:
+            return Response(self.serialize_chunk(list(queryset)))
+
+        # 1. Peek one row past the threshold instead of running a COUNT(*)
+        threshold = settings.STREAMING_LIST_THRESHOLD
+        head = list(queryset[:threshold + 1])
+        if len(head) <= threshold:
+            return Response(self.serialize_chunk(head))
+
+        # 2. Large list: re-read with a server-side cursor and stream
+        response = StreamingHttpResponse(
+            streaming_content(request, self.stream(queryset)), content_type='application/json'
+        )
+        response['X-Streamed'] = 'true'
+        return response
+
+    def stream(self, queryset):
+        renderer = JSONRenderer()
+        chunk_size = settings.STREAMING_LIST_CHUNK_SIZE
+        rows = queryset.iterator(chunk_size=chunk_size)
+
+        yield b'['
+        separator = b''
+        while True:
+            objects = list(islice(rows, chunk_size))
+            if not objects:
+                break
+            # Render the chunk as an array and drop its brackets
+            yield separator + renderer.render(self.serialize_chunk(objects))[1:-1]
+            separator = b','
+        yield b']'
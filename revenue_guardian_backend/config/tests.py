@@ -0,0 +1,183 @@
+import gzip
+from unittest import mock
+
+import brotli
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, override_settings
+
+from . import admin as admin_helpers, db_router
+from .admin import EstimatedCountPaginator
+from .compression import CompressionMiddleware, choose_encoding
+from .db_router import PrimaryReplicaRouter, ReplicaRoutingMiddleware, reporting
+from .streaming import streaming_content
+
+User = get_user_model()
+
+
+# The configured DatabaseCache would query the database, which SimpleTestCase forbids
+@override_settings(
+    DATABASE_REPLICAS=['replica'], REPLICA_PIN_SECONDS=5,
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+)
+@mock.patch.object(db_router, 'is_healthy', return_value=True)
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    """
+    Routing decisions with 'default' as the primary and 'replica' standing in for a replica.
+    """
+    def setUp(self):
+        cache.clear()
+        self.router = PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+        self.agent = User(pk=1, username='agent')
+        # Outside any transaction (TestCase would wrap each test in one)
+        connections = {'default': mock.Mock(in_atomic_block=False)}
+        patcher = mock.patch.object(db_router, 'connections', connections)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.primary_connection = connections['default']
+
+    def route_during(self, request, status=200):
+        """
+        Runs the middleware and records where a read inside the 'view' would go.
+        """
+        seen = {}
+
+        def view(req):
+            req.user = self.agent
+            seen['alias'] = self.router.db_for_read(User)
+            return mock.Mock(status_code=status)
+
+        ReplicaRoutingMiddleware(view)(request)
+        return seen['alias']
+
+    def test_safe_requests_read_from_replica(self, _):
+        self.assertEqual(self.route_during(self.factory.get('/api/policies/')), 'replica')
+
+    def test_writes_and_reads_outside_requests_use_primary(self, _):
+        self.assertEqual(self.route_during(self.factory.post('/api/policies/')), 'default')
+        self.assertEqual(self.router.db_for_read(User), 'default')
+        self.assertEqual(self.router.db_for_write(User), 'default')
+
+    def test_agent_is_pinned_to_primary_after_a_write(self, _):
+        self.route_during(self.factory.post('/api/policies/'))
+
+        self.assertEqual(self.route_during(self.factory.get('/api/policies/')), 'default')
+
+    def test_failed_writes_do_not_pin(self, _):
+        self.route_during(self.factory.post('/api/policies/'), status=400)
+
+        self.assertEqual(self.route_during(self.factory.get('/api/policies/')), 'replica')
+
+    def test_reporting_block_and_transactions(self, _):
+        with reporting():
+            self.assertEqual(self.router.db_for_read(User), 'replica')
+            self.primary_connection.in_atomic_block = True
+            self.assertEqual(self.router.db_for_read(User), 'default')
+
+    def test_database_cache_stays_on_primary(self, _):
+        cache_entry = mock.Mock(_meta=mock.Mock(app_label='django_cache'))
+        with reporting():
+            self.assertEqual(self.router.db_for_read(cache_entry), 'default')
+
+    def test_unhealthy_replica_falls_back_to_primary(self, is_healthy):
+        is_healthy.return_value = False
+
+        self.assertEqual(self.route_during(self.factory.get('/api/policies/')), 'default')
+
+
+@override_settings(COMPRESSION_MIN_SIZE=100)
+class CompressionMiddlewareTests(SimpleTestCase):
+    body = b'{"policy_number": "POL-0001", "status": "ACTIVE"}' * 20
+
+    def respond(self, response, accept_encoding='gzip, deflate, br'):
+        request = RequestFactory().get('/api/policies/', HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_choose_encoding(self):
+        self.assertEqual(choose_encoding('gzip, deflate, br'), 'br')
+        self.assertEqual(choose_encoding('br;q=0.5, gzip'), 'gzip')
+        self.assertIsNone(choose_encoding('identity'))
+
+    def test_malformed_qvalues_are_ignored(self):
+        self.assertEqual(choose_encoding('br;q=1.2.3, gzip'), 'gzip')
+        self.assertIsNone(choose_encoding('gzip;q=., br;q=2'))
+        response = self.respond(HttpResponse(self.body, content_type='application/json'), 'gzip;q=.')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_large_json_is_compressed(self):
+        response = self.respond(HttpResponse(self.body, content_type='application/json'))
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), self.body)
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_small_and_binary_responses_are_left_alone(self):
+        small = self.respond(HttpResponse(b'{}', content_type='application/json'))
+        pdf = self.respond(HttpResponse(self.body, content_type='application/pdf'))
+        self.assertFalse(small.has_header('Content-Encoding'))
+        self.assertFalse(pdf.has_header('Content-Encoding'))
+
+    def test_streaming_response_is_compressed_incrementally(self):
+        stream = StreamingHttpResponse(iter([self.body] * 3), content_type='application/json')
+        response = self.respond(stream, accept_encoding='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), self.body * 3)
+
+
+@override_settings(ADMIN_EXACT_COUNT_LIMIT=10000)
+class StreamingContentTests(SimpleTestCase):
+    def test_wsgi_keeps_the_plain_iterator(self):
+        chunks = iter([b'a', b'b'])
+        self.assertIs(streaming_content(RequestFactory().get('/'), chunks), chunks)
+
+    def test_asgi_streams_chunk_by_chunk_and_compresses(self):
+        request = AsyncRequestFactory().get('/api/policies/', headers={'Accept-Encoding': 'gzip'})
+        pulled = []
+
+        def chunks():
+            for chunk in (b'[', b'{"a": 1}', b']'):
+                pulled.append(chunk)
+                yield chunk
+
+        response = StreamingHttpResponse(streaming_content(request, chunks()), content_type='application/json')
+        self.assertTrue(response.is_async)
+        self.assertEqual(pulled, [])
+        response = CompressionMiddleware(lambda request: response)(request)
+
+        async def body():
+            return b''.join([chunk async for chunk in response.streaming_content])
+
+        self.assertEqual(gzip.decompress(async_to_sync(body)()), b'[{"a": 1}]')
+
+
+class EstimatedCountPaginatorTests(SimpleTestCase):
+    def paginator_count(self, plan_rows):
+        cursor = mock.MagicMock()
+        cursor.__enter__.return_value.fetchone.return_value = (f'[{{"Plan": {{"Plan Rows": {plan_rows}}}}}]',)
+        connection = mock.Mock(vendor='postgresql', cursor=mock.Mock(return_value=cursor))
+
+        class QuerySet:
+            db = 'default'
+            query = mock.Mock(sql_with_params=mock.Mock(return_value=('SELECT 1', ())))
+
+            def order_by(self):
+                return self
+
+            def values(self, *fields):
+                return self
+
+            def count(self):
+                return 42
+
+        queryset = QuerySet()
+        with mock.patch.object(admin_helpers, 'connections', {'default': connection}):
+            return EstimatedCountPaginator(queryset, 50).count
+
+    def test_large_tables_use_the_planner_estimate(self):
+        self.assertEqual(self.paginator_count(2500000), 2500000)
+
+    def test_small_results_are_counted_exactly(self):
+        self.assertEqual(self.paginator_count(40), 42)
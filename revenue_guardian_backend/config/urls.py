@@ -21,4 +21,7 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/auth/', include('users.urls')),
     path('api/', include('policies.urls')), 
+    path('api/', include('documents.urls')),
+    path('api/commissions/', include('commissions.urls')),
+    path('api/', include('notifications.urls')),
 ]
\ No newline at end of file
@@ -0,0 +1,68 @@
+from datetime import timedelta
+from functools import partial
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from documents.models import Document, UploadSession
+from documents.storage import part_path
+
+
+class Command(BaseCommand):
+    help = 'Recounts document references, then deletes unreferenced blobs and stale upload sessions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-hours', type=int, default=24,
+                            help='Keep unreferenced blobs and unfinished uploads younger than this')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['grace_hours'])
+
+        # 1. Repair ref counts from the actual FKs (cascading deletes bypass swap())
+        repaired = 0
+        actual_counts = Document.objects.annotate(
+            n_policies=Count('policies', distinct=True),
+            n_archived=Count('archived_policies', distinct=True),
+            n_statements=Count('statements', distinct=True),
+            n_revisions=Count('statement_revisions', distinct=True),
+        ).values_list('id', 'ref_count', 'n_policies', 'n_archived', 'n_statements', 'n_revisions')
+        for doc_id, ref_count, *references in actual_counts.iterator():
+            if ref_count != sum(references):
+                Document.objects.filter(pk=doc_id).update(ref_count=sum(references))
+                repaired += 1
+        self.stdout.write(f"Repaired {repaired} reference counts.")
+
+        # 2. Delete blobs nobody points at (grace period covers upload -> attach,
+        #    counted from the last upload that stored or reused the blob)
+        orphans = Document.objects.filter(ref_count=0, last_used_at__lt=cutoff)
+        deleted = 0
+        for doc_id in orphans.values_list('id', flat=True).iterator():
+            with transaction.atomic():
+                # Re-checked under lock: the blob may have been attached since the scan
+                document = orphans.select_for_update().filter(pk=doc_id).first()
+                if document is None:
+                    continue
+                # Row first, file once that has committed: a failed delete never
+                # leaves a row pointing at a missing file
+                document.delete()
+                transaction.on_commit(partial(document.file.storage.delete, document.file.name))
+            deleted += 1
+        self.stdout.write(f"Deleted {deleted} unreferenced documents.")
+
+        # 3. Drop abandoned uploads and their temp files
+        stale = UploadSession.objects.filter(completed_at__isnull=True, created_at__lt=cutoff)
+        abandoned = 0
+        for session in stale.iterator():
+            part_path(session).unlink(missing_ok=True)
+            session.delete()
+            abandoned += 1
+        # Chunks left behind by a request that died between receiving and appending
+        for chunk in Path(settings.UPLOAD_TEMP_DIR).glob('*.chunk'):
+            if chunk.stat().st_mtime < cutoff.timestamp():
+                chunk.unlink(missing_ok=True)
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Cleanup Complete. Removed {abandoned} abandoned uploads."))
@@ -0,0 +1,89 @@
+import uuid
+
+from django.conf import settings
+from django.db import models
+from django.db.models import F, Q
+from django.utils import timezone
+
+
+def document_upload_path(instance, filename):
+    # Content-addressed layout: blobs/ab/cd/abcd1234...
+    return f"blobs/{instance.sha256[:2]}/{instance.sha256[2:4]}/{instance.sha256}"
+
+
+class DocumentQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """
+        SECURITY: Blobs are shared across agents, so access is granted per
+        reference: the agent uploaded it, or it is attached to one of their
+        policies, live or archived (or to a statement, for agency admins).
+        """
+        condition = (
+            Q(upload_sessions__agent=user) | Q(policies__client__agent=user)
+            | Q(archived_policies__client__agent=user)
+        )
+        if user.is_agency_admin:
+            condition |= Q(statements__isnull=False) | Q(statement_revisions__isnull=False)
+        return self.filter(condition).distinct()
+
+
+class Document(models.Model):
+    """
+    A stored file, keyed by the SHA-256 of its content.
+    The same carrier PDF uploaded for many policies is stored exactly once.
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    size = models.BigIntegerField()
+    content_type = models.CharField(max_length=100, blank=True)
+    file = models.FileField(upload_to=document_upload_path)
+
+    # How many Policies (live or archived) / Statements currently point at this blob
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Stored or re-uploaded (deduplicated); purge_documents' grace period runs from here
+    last_used_at = models.DateTimeField(default=timezone.now)
+
+    objects = DocumentQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.size} bytes)"
+
+    @classmethod
+    def swap(cls, old_id, new_id):
+        """
+        Moves one reference from `old_id` to `new_id` (either may be None).
+        Uses F() so concurrent attaches never lose an increment.
+        """
+        if old_id == new_id:
+            return
+        if new_id:
+            cls.objects.filter(pk=new_id).update(ref_count=F('ref_count') + 1)
+        if old_id:
+            cls.objects.filter(pk=old_id, ref_count__gt=0).update(ref_count=F('ref_count') - 1)
+
+
+class UploadSession(models.Model):
+    """
+    A resumable, chunked upload. Chunks are appended to a temporary file
+    in order; the client can ask for `received_bytes` and resume from there.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    agent = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='upload_sessions')
+
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, blank=True)
+    total_size = models.BigIntegerField()
+    received_bytes = models.BigIntegerField(default=0)
+
+    # Set once the upload is complete and hashed
+    document = models.ForeignKey(Document, on_delete=models.SET_NULL, null=True, blank=True, related_name='upload_sessions')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.received_bytes}/{self.total_size})"
+
+    @property
+    def is_complete(self):
+        return self.completed_at is not None
@@ -0,0 +1,41 @@
+from django.conf import settings
+from rest_framework import serializers
+from .models import Document, UploadSession
+
+
+class DocumentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Document
+        fields = ['id', 'sha256', 'size', 'content_type', 'created_at']
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """
+    Serializer for a resumable upload.
+    The client declares the file up-front, then PUTs chunks against `id`.
+    """
+    document = DocumentSerializer(read_only=True)
+
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'filename', 'content_type', 'total_size', 'received_bytes', 'document', 'created_at', 'completed_at']
+        read_only_fields = ['received_bytes', 'document', 'completed_at']
+
+    def validate_total_size(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("File is empty.")
+        if value > settings.DOCUMENT_MAX_SIZE:
+            raise serializers.ValidationError(f"File exceeds the {settings.DOCUMENT_MAX_SIZE} byte limit.")
+        return value
+
+
+class AgentDocumentField(serializers.PrimaryKeyRelatedField):
+    """
+    Writable Document reference, restricted to blobs the requesting agent
+    can already see. Prevents attaching someone else's file by guessing its ID.
+    """
+    def get_queryset(self):
+        request = self.context.get('request')
+        if request is None:
+            return Document.objects.none()
+        return Document.objects.visible_to(request.user)
@@ -0,0 +1,203 @@
+import hashlib
+import shutil
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Document, UploadSession
+
+# Read/write granularity. Keeps memory per upload/download constant.
+BLOCK_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    """
+    Raised when a chunk cannot be applied to an UploadSession.
+    """
+
+
+def part_path(session):
+    return Path(settings.UPLOAD_TEMP_DIR) / f"{session.id}.part"
+
+
+def receive_chunk(session, stream, start, length):
+    """
+    Reads one chunk of `length` bytes from the client into a temp file of
+    its own and returns its path. Runs before any lock is taken, so a slow
+    or stalling client never holds a transaction open.
+    """
+    if start != session.received_bytes:
+        raise UploadError(f"Expected chunk at offset {session.received_bytes}, got {start}.")
+    if start + length > session.total_size:
+        raise UploadError("Chunk runs past the declared file size.")
+
+    path = Path(settings.UPLOAD_TEMP_DIR) / f"{session.id}.{uuid.uuid4().hex}.chunk"
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    written = 0
+    with open(path, 'wb') as fh:
+        while written < length:
+            block = stream.read(min(BLOCK_SIZE, length - written))
+            if not block:
+                break
+            fh.write(block)
+            written += len(block)
+
+    if written != length:
+        path.unlink(missing_ok=True)
+        raise UploadError(f"Chunk truncated: expected {length} bytes, got {written}.")
+    return path
+
+
+def append_chunk(session, chunk_path, start):
+    """
+    Appends a received chunk to the session's temp file; call with the
+    session row locked. The chunk must start exactly where the previous
+    one ended, which makes retries idempotent: a client that lost a
+    response just asks for the current offset and resumes from there.
+    The chunk file is removed either way.
+    """
+    try:
+        if session.is_complete:
+            raise UploadError("Upload already completed.")
+        # Re-checked under the lock: a retry of the same chunk may have won
+        if start != session.received_bytes:
+            raise UploadError(f"Expected chunk at offset {session.received_bytes}, got {start}.")
+
+        path = part_path(session)
+        with open(path, 'ab') as fh, open(chunk_path, 'rb') as chunk:
+            # Drop any bytes left behind by an interrupted earlier attempt
+            fh.truncate(start)
+            shutil.copyfileobj(chunk, fh, BLOCK_SIZE)
+            session.received_bytes = fh.tell()
+        session.save(update_fields=['received_bytes'])
+        return session.received_bytes
+    finally:
+        chunk_path.unlink(missing_ok=True)
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for block in iter(lambda: fh.read(BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _store(path, sha256, session):
+    """
+    Writes the temp file into storage as a new Document. If an identical
+    upload won the race, the copy just written is removed and the
+    winner's Document is returned instead.
+    """
+    document = Document(sha256=sha256, size=session.total_size, content_type=session.content_type)
+    with open(path, 'rb') as fh:
+        # FileField.save streams the file in chunks into storage
+        # (a clashing name gets a suffix, so the winner's blob is never overwritten)
+        document.file.save(sha256, File(fh), save=False)
+    try:
+        with transaction.atomic():
+            document.save()
+    except IntegrityError:
+        document.file.delete(save=False)
+        return Document.objects.get(sha256=sha256)
+    return document
+
+
+def finalize_upload(session):
+    """
+    Hashes the assembled file and stores it content-addressed.
+    If a Document with the same hash already exists, the temp file is
+    discarded and the existing blob is reused.
+    Returns the Document, or None if a concurrent request already
+    completed this session (`session` is refreshed either way).
+
+    Hashing and copying into storage happen before the session lock is
+    taken; the lock only covers re-checking and attaching.
+    """
+    if session.received_bytes != session.total_size:
+        raise UploadError(f"Upload incomplete: {session.received_bytes}/{session.total_size} bytes.")
+
+    # 1. Slow work, no transaction open. The file cannot change any more:
+    #    every byte has been received.
+    path = part_path(session)
+    try:
+        sha256 = hash_file(path)
+        if not Document.objects.filter(sha256=sha256).exists():
+            _store(path, sha256, session)
+    except FileNotFoundError:
+        # A concurrent /complete finished first and removed the temp file
+        sha256 = None
+
+    # 2. Attach
+    with transaction.atomic():
+        # Lock the session: a repeated /complete waits here, then sees it is done
+        locked = UploadSession.objects.select_for_update().get(pk=session.pk)
+        session.document_id, session.completed_at = locked.document_id, locked.completed_at
+        if locked.is_complete:
+            return None
+        if sha256 is None:
+            raise UploadError("Upload data is missing; start a new upload.")
+
+        # Locked, so purge_documents cannot delete the blob between here and
+        # the attach; the touch restarts its grace period
+        document = Document.objects.select_for_update().filter(sha256=sha256).first()
+        if document is None:
+            # Purged since step 1 (only possible with a zero grace period)
+            document = _store(path, sha256, locked)
+        document.last_used_at = timezone.now()
+        document.save(update_fields=['last_used_at'])
+
+        session.document = document
+        session.completed_at = timezone.now()
+        session.save(update_fields=['document', 'completed_at'])
+
+    path.unlink(missing_ok=True)
+    return document
+
+
+def parse_range(header, size):
+    """
+    Parses a single 'bytes=start-end' Range header.
+    Returns (start, end) inclusive, or None if the header is absent/unsupported.
+    Raises ValueError if the range cannot be satisfied.
+    """
+    if not header or not header.startswith('bytes='):
+        return None
+    spec = header[len('bytes='):].strip()
+    if ',' in spec:
+        # Multipart ranges are not supported; fall back to a full response
+        return None
+
+    start_s, _, end_s = spec.partition('-')
+    if not start_s:
+        # Suffix range: last N bytes
+        length = int(end_s)
+        if length <= 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+
+    start = int(start_s)
+    end = int(end_s) if end_s else size - 1
+    if start >= size or end < start:
+        raise ValueError(header)
+    return start, min(end, size - 1)
+
+
+def iter_file_range(fieldfile, start, end):
+    """
+    Yields the bytes [start, end] of a stored file in BLOCK_SIZE pieces.
+    """
+    remaining = end - start + 1
+    with fieldfile.open('rb') as fh:
+        fh.seek(start)
+        while remaining > 0:
+            block = fh.read(min(BLOCK_SIZE, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
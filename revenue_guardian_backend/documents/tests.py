@@ -0,0 +1,151 @@
+import hashlib
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from .models import Document, UploadSession
+from .storage import _store, finalize_upload, part_path
+
+User = get_user_model()
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, UPLOAD_TEMP_DIR=Path(MEDIA_ROOT) / 'uploads_tmp')
+class ResumableUploadTests(APITestCase):
+    def setUp(self):
+        self.agent = User.objects.create_user(username='agent', password='pw')
+        self.client.force_authenticate(self.agent)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def upload(self, content, chunk_size=4):
+        session = self.client.post('/api/uploads/', {'filename': 'a.pdf', 'total_size': len(content)}).json()
+        for start in range(0, len(content), chunk_size):
+            chunk = content[start:start + chunk_size]
+            self.client.put(
+                f"/api/uploads/{session['id']}/", chunk, content_type='application/octet-stream',
+                HTTP_CONTENT_RANGE=f"bytes {start}-{start + len(chunk) - 1}/{len(content)}",
+            )
+        return self.client.post(f"/api/uploads/{session['id']}/complete/").json()
+
+    def test_identical_content_is_stored_once(self):
+        first = self.upload(b'carrier statement pdf')
+        second = self.upload(b'carrier statement pdf')
+
+        self.assertEqual(first['document']['id'], second['document']['id'])
+        self.assertEqual(Document.objects.count(), 1)
+
+    def test_out_of_order_chunk_is_rejected_with_resume_offset(self):
+        session = self.client.post('/api/uploads/', {'filename': 'a.pdf', 'total_size': 8}).json()
+        url = f"/api/uploads/{session['id']}/"
+        self.client.put(url, b'abcd', content_type='application/octet-stream', HTTP_CONTENT_RANGE='bytes 0-3/8')
+
+        response = self.client.put(url, b'gh', content_type='application/octet-stream', HTTP_CONTENT_RANGE='bytes 6-7/8')
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['received_bytes'], 4)
+
+    def test_range_download(self):
+        document = self.upload(b'0123456789')['document']
+
+        response = self.client.get(f"/api/documents/{document['id']}/download/", HTTP_RANGE='bytes=2-5')
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), b'2345')
+        self.assertEqual(response['Content-Range'], 'bytes 2-5/10')
+
+    def test_repeated_complete_on_a_stale_session_is_harmless(self):
+        session = self.client.post('/api/uploads/', {'filename': 'a.pdf', 'total_size': 4}).json()
+        self.client.put(
+            f"/api/uploads/{session['id']}/", b'abcd', content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE='bytes 0-3/4',
+        )
+        first, stale = UploadSession.objects.get(pk=session['id']), UploadSession.objects.get(pk=session['id'])
+
+        document = finalize_upload(first)
+
+        self.assertIsNone(finalize_upload(stale))
+        self.assertEqual(stale.document_id, document.pk)
+        self.assertFalse(part_path(stale).exists())
+
+    def test_losing_an_identical_upload_race_reuses_the_winner(self):
+        content = b'same statement'
+        sha256 = hashlib.sha256(content).hexdigest()
+        winner = Document(sha256=sha256, size=len(content))
+        winner.file.save(sha256, ContentFile(content))
+        session = UploadSession.objects.create(agent=self.agent, filename='a.pdf', total_size=len(content))
+        path = part_path(session)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+
+        self.assertEqual(_store(path, sha256, session), winner)
+        blobs = Path(MEDIA_ROOT) / Path(winner.file.name).parent
+        self.assertEqual([blob.name for blob in blobs.iterdir()], [sha256])
+
+    def test_purge_deletes_the_row_then_the_file(self):
+        document = Document(sha256='f' * 64, size=3)
+        document.file.save('f' * 64, ContentFile(b'old'))
+        Document.objects.filter(pk=document.pk).update(last_used_at=timezone.now() - timedelta(days=2))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('purge_documents', stdout=StringIO())
+
+        self.assertFalse(Document.objects.filter(pk=document.pk).exists())
+        self.assertFalse(Path(document.file.path).exists())
+
+    def test_reusing_an_old_orphan_restarts_its_grace_period(self):
+        first = self.upload(b'old statement')['document']
+        Document.objects.filter(pk=first['id']).update(last_used_at=timezone.now() - timedelta(days=3))
+
+        second = self.upload(b'old statement')
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('purge_documents', stdout=StringIO())
+
+        self.assertEqual(second['document']['id'], first['id'])
+        self.assertTrue(Document.objects.filter(pk=first['id']).exists())
+        self.assertEqual(UploadSession.objects.get(pk=second['id']).document_id, first['id'])
+
+    @skipUnless(connection.features.has_select_for_update, 'Needs SELECT ... FOR UPDATE')
+    def test_reused_blob_is_locked_until_attached(self):
+        self.upload(b'shared statement')
+        session = self.client.post('/api/uploads/', {'filename': 'a.pdf', 'total_size': 16}).json()
+        self.client.put(
+            f"/api/uploads/{session['id']}/", b'shared statement', content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE='bytes 0-15/16',
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            finalize_upload(UploadSession.objects.get(pk=session['id']))
+
+        lookups = [q['sql'] for q in queries if 'FROM "documents_document"' in q['sql']]
+        self.assertTrue(any(sql.endswith('FOR UPDATE') for sql in lookups), lookups)
+
+    def test_chunk_is_read_before_the_session_is_locked(self):
+        session = self.client.post('/api/uploads/', {'filename': 'a.pdf', 'total_size': 4}).json()
+        url = f"/api/uploads/{session['id']}/"
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.put(url, b'abcd', content_type='application/octet-stream', HTTP_CONTENT_RANGE='bytes 0-3/4')
+
+        self.assertEqual(response.json()['received_bytes'], 4)
+        self.assertEqual(list(Path(MEDIA_ROOT, 'uploads_tmp').glob('*.chunk')), [])
+        if connection.features.has_select_for_update:
+            # Plain read, then one short locked transaction
+            sql = [q['sql'] for q in queries if 'documents_uploadsession' in q['sql']]
+            self.assertFalse(sql[0].endswith('FOR UPDATE'))
+            self.assertTrue(sql[1].endswith('FOR UPDATE'))
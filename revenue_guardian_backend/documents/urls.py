@@ -0,0 +1,15 @@
+from django.urls import path
+from .views import (
+    UploadSessionCreateView, UploadSessionDetailView, UploadSessionCompleteView,
+    DocumentDownloadView,
+)
+
+urlpatterns = [
+    # Resumable uploads
+    path('uploads/', UploadSessionCreateView.as_view(), name='upload-create'),
+    path('uploads/<uuid:pk>/', UploadSessionDetailView.as_view(), name='upload-detail'),
+    path('uploads/<uuid:pk>/complete/', UploadSessionCompleteView.as_view(), name='upload-complete'),
+
+    # Downloads
+    path('documents/<int:pk>/download/', DocumentDownloadView.as_view(), name='document-download'),
+]
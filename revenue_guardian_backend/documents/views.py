@@ -0,0 +1,164 @@
+import re
+
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from config.streaming import streaming_content
+from notifications.events import publish
+from .models import Document, UploadSession
+from .serializers import UploadSessionSerializer
+from .storage import UploadError, append_chunk, finalize_upload, iter_file_range, parse_range, receive_chunk
+
+CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
+
+class UploadSessionCreateView(generics.CreateAPIView):
+    """
+    Step 1: Declare a file (name, size). Returns the session `id` to PUT chunks to.
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def perform_create(self, serializer):
+        serializer.save(agent=self.request.user)
+
+
+class UploadSessionDetailView(APIView):
+    """
+    GET: Current state of the upload. `received_bytes` is the offset to resume from.
+    PUT: Append one chunk. The raw body is the chunk, positioned by the
+         header `Content-Range: bytes <start>-<end>/<total>`.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_session(self, pk, lock=False):
+        # SECURITY: Agents can only see their own uploads
+        queryset = UploadSession.objects.filter(agent=self.request.user)
+        if lock:
+            queryset = queryset.select_for_update()
+        return get_object_or_404(queryset, pk=pk)
+
+    def get(self, request, pk):
+        return Response(UploadSessionSerializer(self.get_session(pk)).data)
+
+    def put(self, request, pk):
+        match = CONTENT_RANGE_RE.match(request.headers.get('Content-Range', ''))
+        if not match:
+            return Response({"detail": "Content-Range header required: bytes <start>-<end>/<total>."}, status=status.HTTP_400_BAD_REQUEST)
+
+        start, end, total = (int(g) for g in match.groups())
+        length = end - start + 1
+        if length <= 0 or length > settings.UPLOAD_MAX_CHUNK_SIZE:
+            return Response({"detail": f"Chunk size must be between 1 and {settings.UPLOAD_MAX_CHUNK_SIZE} bytes."}, status=status.HTTP_400_BAD_REQUEST)
+
+        session = self.get_session(pk)
+        if session.is_complete:
+            return Response({"detail": "Upload already completed."}, status=status.HTTP_409_CONFLICT)
+        if total != session.total_size:
+            return Response({"detail": "Total size does not match the declared size."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            # 1. Read the body off the (possibly slow) client with no transaction open.
+            #    request.stream reads it directly, without buffering it in memory.
+            chunk_path = receive_chunk(session, request.stream, start, length)
+
+            # 2. Lock the row only to re-check the offset and append, so two
+            #    retries of the same chunk cannot interleave
+            with transaction.atomic():
+                session = self.get_session(pk, lock=True)
+                append_chunk(session, chunk_path, start)
+        except UploadError as e:
+            return Response(
+                {"detail": str(e), "received_bytes": session.received_bytes},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        return Response(UploadSessionSerializer(session).data)
+
+
+class UploadSessionCompleteView(APIView):
+    """
+    Step 3: Hash the assembled file and store it (or reuse an identical blob).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, pk):
+        session = get_object_or_404(UploadSession.objects.filter(agent=request.user), pk=pk)
+        if not session.is_complete:
+            try:
+                document = finalize_upload(session)
+            except UploadError as e:
+                return Response(
+                    {"detail": str(e), "received_bytes": session.received_bytes},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            # None: a concurrent /complete finished it and has already announced it
+            if document is not None:
+                publish(request.user.pk, 'import.completed', {
+                    'upload': str(session.pk), 'filename': session.filename, 'document': document.pk,
+                })
+        return Response(UploadSessionSerializer(session).data)
+
+
+class DocumentDownloadView(APIView):
+    """
+    Streams a stored document. Supports single `Range: bytes=` requests
+    so interrupted downloads and PDF viewers can fetch just what they need.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        document = get_object_or_404(Document.objects.visible_to(request.user), pk=pk)
+
+        # Content never changes for a given hash, so the hash is a perfect ETag
+        etag = f'"{document.sha256}"'
+        if request.headers.get('If-None-Match') == etag:
+            return HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+
+        try:
+            byte_range = parse_range(request.headers.get('Range'), document.size)
+        except ValueError:
+            response = HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+            response['Content-Range'] = f"bytes */{document.size}"
+            return response
+
+        if byte_range is None:
+            start, end = 0, document.size - 1
+            response = StreamingHttpResponse(streaming_content(request, iter_file_range(document.file, start, end)))
+        else:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                streaming_content(request, iter_file_range(document.file, start, end)),
+                status=status.HTTP_206_PARTIAL_CONTENT,
+            )
+            response['Content-Range'] = f"bytes {start}-{end}/{document.size}"
+
+        response['Content-Type'] = document.content_type or 'application/octet-stream'
+        response['Content-Length'] = str(end - start + 1)
+        response['Accept-Ranges'] = 'bytes'
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, max-age=31536000, immutable'
+        return response
+
+
+class DocumentReferenceMixin:
+    """
+    Keeps Document.ref_count in step with a model's `document` FK.
+    Mix into generic views whose model has a nullable `document` field.
+    """
+    def perform_create(self, serializer):
+        instance = serializer.save()
+        Document.swap(None, instance.document_id)
+
+    def perform_update(self, serializer):
+        old_document_id = serializer.instance.document_id
+        instance = serializer.save()
+        Document.swap(old_document_id, instance.document_id)
+
+    def perform_destroy(self, instance):
+        Document.swap(instance.document_id, None)
+        instance.delete()
@@ -0,0 +1,228 @@
+"""
+Per-agent event delivery for the SSE stream.
+
+- publish() appends to the AgentEvent log once the surrounding
+  transaction commits, then kicks this process's poller so open streams
+  hear about it straight away.
+- ONE poller per process reads new events for every subscribed agent in
+  a single indexed query (on a kick, or every SSE_POLL_SECONDS for events
+  published by other processes) and fans them out to the streams.
+- A stream only queries the database once, for its backlog on connect.
+  Every query here runs on a pooled worker thread and closes its
+  connection before returning: under ASGI a thread-sensitive call would
+  pin a thread (and its connection) to each request for the life of the
+  stream. An idle stream is just a coroutine waiting on an asyncio.Event.
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+from django.db.models import Max
+
+from config.db_router import primary
+from .models import AgentEvent
+
+
+def publish(agent_id, kind, payload):
+    """
+    Queues an event for `agent_id`. Nothing is sent if the caller's
+    transaction rolls back.
+    """
+    def record():
+        event = AgentEvent.objects.create(agent_id=agent_id, kind=kind, payload=payload)
+        broker.notify(agent_id)
+        return event
+
+    transaction.on_commit(record)
+
+
+def latest_event_id():
+    return AgentEvent.objects.aggregate(latest=Max('id'))['latest'] or 0
+
+
+def pooled_query(func):
+    """
+    Async wrapper for a short event query: runs on the shared executor (not
+    the request's thread), reads the primary (the log is append-only and
+    a lagging replica would skip events), and closes its connection.
+    """
+    @wraps(func)
+    def run(*args):
+        try:
+            with primary():
+                return func(*args)
+        finally:
+            connections.close_all()
+
+    return sync_to_async(run, thread_sensitive=False)
+
+
+@pooled_query
+def _backlog(agent_id, after_id):
+    """
+    (events of `agent_id` after `after_id`, the log's high-water mark when the read began)
+    """
+    high_water = latest_event_id()
+    events = []
+    while True:
+        batch = list(
+            AgentEvent.objects.filter(agent_id=agent_id, id__gt=after_id, id__lte=high_water)
+            .order_by('id')[:settings.SSE_BATCH_SIZE]
+        )
+        events.extend(batch)
+        if len(batch) < settings.SSE_BATCH_SIZE:
+            return events, high_water
+        after_id = batch[-1].pk
+
+
+@pooled_query
+def _new_events(agent_ids, after_id):
+    return list(
+        AgentEvent.objects.filter(agent_id__in=agent_ids, id__gt=after_id)
+        .order_by('id')[:settings.SSE_BATCH_SIZE]
+    )
+
+
+class Subscription:
+    def __init__(self, agent_id):
+        self.agent_id = agent_id
+        self.pending = []
+        self.wakeup = asyncio.Event()
+
+    def deliver(self, events):
+        # Called by the poller, on this subscription's loop
+        self.pending.extend(events)
+        self.wakeup.set()
+
+
+class EventBroker:
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+        self._poller = None
+        self._kick = None
+
+    def subscribe(self, agent_id):
+        subscription = Subscription(agent_id)
+        with self._lock:
+            self._subscriptions[agent_id].add(subscription)
+        return subscription
+
+    def start(self, high_water):
+        """
+        Starts the poller (if it is not running) from `high_water`: the first
+        stream read everything up to there itself.
+        """
+        loop = asyncio.get_running_loop()
+        poller = self._poller
+        if poller is None or poller.done() or poller.get_loop() is not loop:
+            self._kick = asyncio.Event()
+            self._poller = asyncio.create_task(self._poll(high_water, self._kick))
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.agent_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.agent_id]
+            idle = not self._subscriptions
+        if idle and self._poller is not None:
+            self._poller.cancel()
+            self._poller = None
+
+    def notify(self, agent_id):
+        """
+        Thread-safe: publish() runs in worker threads (or in a process with no streams at all).
+        """
+        poller, kick = self._poller, self._kick
+        if poller is None or poller.done():
+            return
+        loop = poller.get_loop()
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(kick.set)
+
+    @property
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+    async def _poll(self, high_water, kick):
+        """
+        Cancelled when the last stream closes; the next stream restarts it.
+        """
+        while True:
+            try:
+                await asyncio.wait_for(kick.wait(), timeout=settings.SSE_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            kick.clear()
+
+            with self._lock:
+                agent_ids = list(self._subscriptions)
+            if not agent_ids:
+                continue
+            events = await _new_events(agent_ids, high_water)
+            if not events:
+                continue
+            high_water = events[-1].pk
+
+            by_agent = defaultdict(list)
+            for event in events:
+                by_agent[event.agent_id].append(event)
+            for agent_id, agent_events in by_agent.items():
+                with self._lock:
+                    subscriptions = list(self._subscriptions.get(agent_id, ()))
+                for subscription in subscriptions:
+                    subscription.deliver(agent_events)
+            if len(events) == settings.SSE_BATCH_SIZE:
+                # More waiting: read the next batch without sleeping
+                kick.set()
+
+
+# One broker per process
+broker = EventBroker()
+
+
+def format_event(event):
+    data = json.dumps(event.payload, cls=DjangoJSONEncoder)
+    return f"id: {event.pk}\nevent: {event.kind}\ndata: {data}\n\n".encode()
+
+
+async def event_stream(agent_id, last_event_id):
+    """
+    Yields SSE frames for one agent: the backlog after `last_event_id`,
+    then the events the broker fans out, with a comment line every
+    SSE_HEARTBEAT_SECONDS so proxies keep the connection open.
+    """
+    # Subscribed before the backlog read, so nothing falls between the two
+    subscription = broker.subscribe(agent_id)
+    try:
+        backlog, high_water = await _backlog(agent_id, last_event_id)
+        broker.start(high_water)
+        yield f"retry: {settings.SSE_RETRY_MILLISECONDS}\n\n".encode()
+        subscription.pending[:0] = backlog
+
+        while True:
+            events, subscription.pending = subscription.pending, []
+            subscription.wakeup.clear()
+            for event in events:
+                # The poller may hand over events the backlog already covered
+                if event.pk > last_event_id:
+                    yield format_event(event)
+                    last_event_id = event.pk
+            if subscription.pending:
+                continue
+
+            try:
+                await asyncio.wait_for(subscription.wakeup.wait(), timeout=settings.SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+    finally:
+        broker.unsubscribe(subscription)
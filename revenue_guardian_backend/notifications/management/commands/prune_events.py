@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from notifications.models import AgentEvent
+
+BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = 'Deletes delivered stream events older than the retention window'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=7,
+                            help='Keep events younger than this (browsers only replay recent ones)')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+
+        # Delete in batches: short transactions, no long lock on the log
+        deleted = 0
+        while True:
+            ids = list(AgentEvent.objects.filter(created_at__lt=cutoff).values_list('id', flat=True)[:BATCH_SIZE])
+            if not ids:
+                break
+            deleted += AgentEvent.objects.filter(id__in=ids).delete()[0]
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Process Complete. Deleted {deleted} events."))
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.db import models
+
+
+class AgentEvent(models.Model):
+    """
+    Durable log behind the per-agent event stream (/api/events/).
+    The id doubles as the SSE event id, so a reconnecting browser resumes
+    from Last-Event-ID without missing anything.
+    """
+    KIND_CHOICES = [
+        ('policy.pending', 'Renewal due (policy is Pending Renewal)'),
+        ('statement.progress', 'Statement reconciliation progress'),
+        ('import.completed', 'Import completed'),
+    ]
+
+    agent = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='events')
+    kind = models.CharField(max_length=40, choices=KIND_CHOICES)
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # "Events for this agent after id N": the only query a stream runs
+            models.Index(fields=['agent', 'id'], name='agent_event_agent_id'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} for agent {self.agent_id}"
@@ -0,0 +1,196 @@
+import asyncio
+import threading
+from datetime import timedelta
+from io import StringIO
+
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from policies.models import Carrier, Client, Policy
+from .events import broker, event_stream, publish
+from .models import AgentEvent
+
+User = get_user_model()
+
+
+async def next_frame(stream):
+    return await asyncio.wait_for(stream.__anext__(), timeout=5)
+
+
+@override_settings(SSE_HEARTBEAT_SECONDS=5, SSE_POLL_SECONDS=60)
+class EventStreamTests(TransactionTestCase):
+    # Stream queries run on pooled threads with their own connections: test data must be committed
+
+    def setUp(self):
+        self.agent = User.objects.create_user(username='agent', password='pw')
+
+    def publish(self, kind='import.completed', **payload):
+        # Autocommit: the on_commit hook runs straight away
+        publish(self.agent.pk, kind, payload)
+
+    async def test_replays_events_after_last_event_id(self):
+        await sync_to_async(self.publish)(upload='a')
+        await sync_to_async(self.publish)(upload='b')
+        first = await AgentEvent.objects.order_by('id').afirst()
+
+        stream = event_stream(self.agent.pk, first.pk)
+        try:
+            self.assertTrue((await next_frame(stream)).startswith(b'retry:'))
+            frame = await next_frame(stream)
+        finally:
+            await stream.aclose()
+
+        self.assertIn(b'event: import.completed\n', frame)
+        self.assertIn(b'data: {"upload": "b"}', frame)
+        self.assertEqual(broker.subscriber_count, 0)
+
+    async def test_publish_wakes_an_open_stream(self):
+        stream = event_stream(self.agent.pk, 0)
+        try:
+            await next_frame(stream)  # retry
+            waiting = asyncio.ensure_future(next_frame(stream))
+            await asyncio.sleep(0.05)
+            self.assertFalse(waiting.done())
+
+            await sync_to_async(self.publish)('statement.progress', statement=1, stage='started')
+            frame = await waiting
+        finally:
+            await stream.aclose()
+        self.assertIn(b'event: statement.progress\n', frame)
+
+    @override_settings(SSE_POLL_SECONDS=0.05)
+    async def test_poller_picks_up_events_from_other_processes(self):
+        stream = event_stream(self.agent.pk, 0)
+        try:
+            await next_frame(stream)  # retry
+            waiting = asyncio.ensure_future(next_frame(stream))
+            await asyncio.sleep(0.05)
+
+            # Written straight to the log, as a cron command in another process would
+            await AgentEvent.objects.acreate(agent=self.agent, kind='policy.pending', payload={'policy': 1})
+            frame = await waiting
+        finally:
+            await stream.aclose()
+        self.assertIn(b'event: policy.pending\n', frame)
+
+    async def test_stream_requires_a_ticket(self):
+        response = await self.async_client.get('/api/events/?ticket=forged')
+        self.assertEqual(response.status_code, 401)
+
+    async def test_ticket_opens_an_event_stream(self):
+        api = APIClient()
+        api.force_authenticate(self.agent)
+        ticket = (await sync_to_async(api.post)('/api/events/ticket/')).json()['ticket']
+
+        response = await self.async_client.get(f'/api/events/?ticket={ticket}', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+
+    async def test_first_connection_starts_at_the_high_water_mark(self):
+        await sync_to_async(self.publish)(upload='old')
+        api = APIClient()
+        api.force_authenticate(self.agent)
+        ticket = (await sync_to_async(api.post)('/api/events/ticket/')).json()
+        latest = await AgentEvent.objects.order_by('id').alast()
+        self.assertEqual(ticket['last_event_id'], latest.pk)
+
+        response = await self.async_client.get(f"/api/events/?ticket={ticket['ticket']}")
+        await sync_to_async(self.publish)(upload='new')
+        stream = aiter(response.streaming_content)
+        try:
+            await next_frame(stream)  # retry
+            frame = await next_frame(stream)
+        finally:
+            await stream.aclose()
+        self.assertIn(b'data: {"upload": "new"}', frame)
+
+
+    def open_connections(self):
+        if connection.vendor != 'postgresql':
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM pg_stat_activity WHERE datname = current_database()")
+            return cursor.fetchone()[0]
+
+    def test_idle_streams_hold_no_thread_or_connection(self):
+        self.publish(upload='a')
+        opened, streams_open, go_on, release = [], [threading.Event(), threading.Event()], threading.Event(), threading.Event()
+
+        async def until(event):
+            while not event.is_set():
+                await asyncio.sleep(0.01)
+
+        async def hold_stream():
+            # As the ASGI handler does for each request
+            async with ThreadSensitiveContext():
+                stream = event_stream(self.agent.pk, 0)
+                try:
+                    await next_frame(stream)  # retry
+                    await next_frame(stream)  # the backlog event: read from the database
+                    opened.append(stream)
+                    await until(release)
+                finally:
+                    await stream.aclose()
+
+        async def open_streams(n):
+            # One after another: simultaneous connects may briefly borrow more
+            # pooled threads, up to the executor's fixed size, never one per stream
+            tasks = []
+            for _ in range(n):
+                tasks.append(asyncio.ensure_future(hold_stream()))
+                count = len(opened)
+                while len(opened) == count:
+                    await asyncio.sleep(0.01)
+            return tasks
+
+        async def server():
+            tasks = await open_streams(1)
+            streams_open[0].set()
+            await until(go_on)
+            tasks += await open_streams(20)
+            streams_open[1].set()
+            await asyncio.gather(*tasks)
+
+        # A loop of its own, like uvicorn's: the test's async_to_sync would
+        # otherwise run every thread-sensitive call on the main thread
+        loop_thread = threading.Thread(target=asyncio.run, args=(server(),))
+        loop_thread.start()
+        try:
+            self.assertTrue(streams_open[0].wait(10))
+            threads, connections = threading.active_count(), self.open_connections()
+            go_on.set()
+            self.assertTrue(streams_open[1].wait(10))
+            self.assertEqual(broker.subscriber_count, 21)
+            self.assertEqual(threading.active_count(), threads)
+            self.assertEqual(self.open_connections(), connections)
+        finally:
+            go_on.set()
+            release.set()
+            loop_thread.join(10)
+
+
+class RenewalEventTests(TestCase):
+    def test_check_renewals_publishes_pending_policies(self):
+        agent = User.objects.create_user(username='agent', password='pw', email='agent@example.com')
+        client = Client.objects.create(agent=agent, name='Jane Doe', email='jane@example.com', phone='1', gender='F')
+        renewal = timezone.now().date() + timedelta(days=30)
+        policy = Policy.objects.create(
+            client=client, carrier=Carrier.objects.create(name='Allianz'), policy_number='POL-1', policy_type='LIFE',
+            premium_amount=100, sum_insured=1000, start_date=renewal - timedelta(days=365), end_date=renewal,
+            renewal_date=renewal,
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('check_renewals', stdout=StringIO())
+
+        event = AgentEvent.objects.get(agent=agent)
+        self.assertEqual(event.kind, 'policy.pending')
+        self.assertEqual(event.payload['policy'], policy.pk)
+        self.assertEqual(event.payload['days_left'], 30)
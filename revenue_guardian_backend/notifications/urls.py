@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import EventStreamView, EventTicketView
+
+urlpatterns = [
+    path('events/', EventStreamView.as_view(), name='event-stream'),
+    path('events/ticket/', EventTicketView.as_view(), name='event-ticket'),
+]
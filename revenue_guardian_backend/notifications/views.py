@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.core import signing
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .events import event_stream, latest_event_id, pooled_query
+
+TICKET_SALT = 'notifications.events'
+
+
+class EventTicketView(APIView):
+    """
+    Step 1: Exchange the JWT for a short-lived stream ticket.
+    EventSource cannot send an Authorization header, and a ticket in the
+    URL is safer than the access token itself (URLs end up in logs).
+    `last_event_id` is the current high-water mark: a first connection
+    passes it on so it only sees events from now on, not the whole log.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        ticket = signing.dumps({'agent': request.user.pk}, salt=TICKET_SALT)
+        return Response({
+            'ticket': ticket,
+            'expires_in': settings.SSE_TICKET_SECONDS,
+            'last_event_id': latest_event_id(),
+        })
+
+
+class EventStreamView(View):
+    """
+    Step 2: GET /api/events/?ticket=... opens a text/event-stream of the
+    agent's events. Resumes after the Last-Event-ID header (sent by the
+    browser on reconnect) or ?last_event_id=; without either it starts at
+    the current high-water mark (no replay of the retained log).
+
+    Async view: served by the ASGI app (config/asgi.py), an idle stream
+    costs a coroutine, not a worker thread.
+    """
+
+    async def get(self, request):
+        # SECURITY: The ticket is signed and expires; it names the only agent this stream can see
+        try:
+            claims = signing.loads(
+                request.GET.get('ticket', ''), salt=TICKET_SALT, max_age=settings.SSE_TICKET_SECONDS
+            )
+        except signing.BadSignature:
+            return JsonResponse({'detail': "Invalid or expired ticket."}, status=401)
+
+        last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+        if not last_event_id:
+            last_event_id = await pooled_query(latest_event_id)()
+        try:
+            last_event_id = int(last_event_id)
+        except ValueError:
+            return JsonResponse({'detail': "Last-Event-ID must be an integer."}, status=400)
+
+        response = StreamingHttpResponse(event_stream(claims['agent'], last_event_id), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Stop nginx from buffering the stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
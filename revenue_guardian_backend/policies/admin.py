@@ -1,3 +1,85 @@
 from django.contrib import admin
+from django.db.models import Q
 
-# Register your models here.
+from config.admin import LargeTableAdmin
+from .cache import invalidate_book
+from .dedupe import normalize_email, normalize_name, normalize_phone
+from .matching import normalize_policy_number
+from .models import Carrier, Client, Policy
+
+
+@admin.register(Carrier)
+class CarrierAdmin(admin.ModelAdmin):
+    list_display = ['name', 'support_email']
+    search_fields = ['name']
+
+
+@admin.register(Client)
+class ClientAdmin(LargeTableAdmin):
+    list_display = ['name', 'email', 'phone', 'agent', 'created_at']
+    list_select_related = ['agent']
+    # Also backs the Policy.client autocomplete; see get_search_results
+    search_fields = ['^name_key', '^email_key', '^phone_key']
+    raw_id_fields = ['agent']
+    # Derived in Client.save (see policies/dedupe.py)
+    readonly_fields = ['name_key', 'email_key', 'phone_key']
+
+    def get_search_results(self, request, queryset, search_term):
+        # Prefix match on the indexed normalized keys, not an icontains scan:
+        # "Doe, Jane" -> "doe jane", "Jane.Doe+work@Example.com" -> "jane.doe@example.com",
+        # "+1 (555) 010" -> "1555010"
+        lookup = Q()
+        for field, key in (
+            ('name_key', normalize_name(search_term)),
+            ('email_key', normalize_email(search_term)),
+            ('phone_key', normalize_phone(search_term)),
+        ):
+            if key:
+                lookup |= Q(**{f'{field}__startswith': key})
+        if not lookup:
+            return queryset, False
+        return queryset.filter(lookup), False
+
+
+def status_action(status, label):
+    """
+    Bulk status change as ONE UPDATE (save() is bypassed, so the
+    affected agents' cached forecasts are invalidated here).
+    """
+    @admin.action(description=f"Mark selected policies as {label}")
+    def action(modeladmin, request, queryset):
+        agent_ids = set(queryset.values_list('client__agent_id', flat=True).distinct())
+        updated = queryset.update(status=status)
+        invalidate_book(*agent_ids)
+        modeladmin.message_user(request, f"{updated} policies marked as {label}.")
+
+    action.__name__ = f"mark_{status.lower()}"
+    return action
+
+
+@admin.register(Policy)
+class PolicyAdmin(LargeTableAdmin):
+    list_display = [
+        'policy_number', 'client', 'carrier', 'policy_type', 'status', 'premium_amount', 'renewal_date'
+    ]
+    list_select_related = ['client', 'carrier']
+    list_filter = ['status', 'carrier', ('renewal_date', admin.DateFieldListFilter)]
+    search_fields = ['policy_number_key']
+    autocomplete_fields = ['client', 'carrier']
+    raw_id_fields = ['document']
+    # Derived in Policy.save (see policies/matching.py)
+    readonly_fields = ['policy_number_key', 'prev_policy_number_key']
+    actions = [status_action(status, label) for status, label in Policy.STATUS_CHOICES]
+
+    def get_queryset(self, request):
+        # __str__ shows the client name (also in autocomplete results). The
+        # changelist skips list_select_related once a queryset has joins, so
+        # repeat it here.
+        return super().get_queryset(request).select_related(*self.list_select_related)
+
+    def get_search_results(self, request, queryset, search_term):
+        # "pol-000123" finds POL123: search the indexed normalized keys, not a LIKE scan
+        key = normalize_policy_number(search_term)
+        if not key:
+            return queryset, False
+        return queryset.filter(Q(policy_number_key__startswith=key) | Q(prev_policy_number_key=key)), False
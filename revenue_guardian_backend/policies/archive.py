@@ -0,0 +1,57 @@
+from django.db import transaction
+from django.db.models import F
+
+from .cache import invalidate_book
+from .models import ArchivedPolicy, Policy
+
+# Policies that can no longer change
+CLOSED_STATUSES = ['LAPSED', 'CANCELLED']
+
+# Columns copied verbatim; the archive keeps the policy's id
+ARCHIVED_COLUMNS = [
+    'id', 'client_id', 'carrier_id', 'policy_number', 'prev_policy_number', 'policy_type', 'status',
+    'premium_amount', 'sum_insured', 'start_date', 'end_date', 'renewal_date', 'policy_file', 'document_id',
+]
+
+
+def include_history(request):
+    """
+    Archived rows are only read when the caller asks: ?include_history=true
+    """
+    return request.query_params.get('include_history') == 'true'
+
+
+def archivable(cutoff):
+    return Policy.objects.filter(status__in=CLOSED_STATUSES, end_date__lt=cutoff)
+
+
+def archive_batch(cutoff, batch_size):
+    """
+    Moves up to `batch_size` closed policies that ended before `cutoff`
+    into ArchivedPolicy, in one short transaction:
+      1. copy the rows (bulk INSERT),
+      2. re-point their commission lines at the archived copy (one UPDATE),
+      3. delete the live rows.
+    Document references move with the row, so ref counts are unchanged.
+    Returns the number of policies archived (0 when done).
+    """
+    from commissions.models import CommissionTransaction
+
+    with transaction.atomic():
+        rows = list(
+            archivable(cutoff).select_for_update(skip_locked=True, of=('self',))
+            .order_by('id').values(*ARCHIVED_COLUMNS, 'client__agent_id')[:batch_size]
+        )
+        if not rows:
+            return 0
+
+        ids = [row['id'] for row in rows]
+        agent_ids = {row.pop('client__agent_id') for row in rows}
+
+        ArchivedPolicy.objects.bulk_create([ArchivedPolicy(**row) for row in rows])
+        CommissionTransaction.objects.filter(policy_id__in=ids).update(archived_policy_id=F('policy_id'), policy=None)
+        Policy.objects.filter(id__in=ids).delete()
+
+    # Bypasses Policy.delete()
+    invalidate_book(*agent_ids)
+    return len(rows)
@@ -0,0 +1,28 @@
+import time
+
+from django.core.cache import cache
+
+
+def _version_key(agent_id):
+    return f"policies:book-version:{agent_id}"
+
+
+def book_version(agent_id):
+    """
+    Opaque token that changes whenever the agent's policies change.
+    Cached results keyed on it go stale automatically.
+    """
+    version = cache.get(_version_key(agent_id))
+    if version is None:
+        version = time.time_ns()
+        cache.set(_version_key(agent_id), version, timeout=None)
+    return version
+
+
+def invalidate_book(*agent_ids):
+    """
+    Call after any write to an agent's policies that bypasses Policy.save()
+    (QuerySet.update, bulk_update, bulk_create).
+    """
+    for agent_id in agent_ids:
+        cache.set(_version_key(agent_id), time.time_ns(), timeout=None)
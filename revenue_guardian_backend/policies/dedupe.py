@@ -0,0 +1,196 @@
+import re
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+from django.db import transaction
+from django.db.models import Q
+
+from .cache import invalidate_book
+
+NON_DIGIT_RE = re.compile(r'\D')
+NAME_TOKEN_RE = re.compile(r'[a-z]+')
+
+# A blocking key shared by more clients than this (an office phone, a
+# shared family inbox) does not identify a person; the block is skipped.
+MAX_BLOCK_SIZE = 50
+
+# Two name tokens this similar are treated as the same word (typos)
+TOKEN_SIMILARITY = 0.75
+
+
+def normalize_email(email):
+    # "Jane.Doe+work@Example.com " -> "jane.doe@example.com"
+    local, _, domain = (email or '').strip().lower().partition('@')
+    return f"{local.split('+')[0]}@{domain}" if domain else local
+
+
+def normalize_phone(phone):
+    # Last 10 digits: drops country codes, spaces and punctuation
+    return NON_DIGIT_RE.sub('', phone or '')[-10:]
+
+
+def normalize_name(name):
+    # Order-independent: "Doe, Jane" and "jane doe" -> "doe jane"
+    return ' '.join(sorted(NAME_TOKEN_RE.findall((name or '').lower())))
+
+
+def names_match(a, b):
+    """
+    Token-wise comparison of two name keys: every token of the shorter name
+    must closely match a token of the longer one. "doe jnae" matches
+    "doe jane"; "doe john" does not.
+    """
+    tokens_a, tokens_b = a.split(), b.split()
+    if not tokens_a or not tokens_b:
+        return False
+    shorter, longer = sorted((tokens_a, tokens_b), key=len)
+    return all(
+        max(SequenceMatcher(None, token, other).ratio() for other in longer) >= TOKEN_SIMILARITY
+        for token in shorter
+    )
+
+
+def is_duplicate(a, b):
+    """
+    Compares two clients (dicts with email_key, phone_key, name_key).
+    Returns 'high', 'possible' or None.
+
+    'high' (safe to merge) needs the exact name key plus a shared contact,
+    or a shared email plus a typo-level name difference. A shared phone is
+    a household: John/Joan Doe or Jane Doe / Jane Doe Jr on one landline
+    are only ever 'possible', as is an extra suffix on a shared email.
+    """
+    same_email = bool(a['email_key']) and a['email_key'] == b['email_key']
+    same_phone = bool(a['phone_key']) and a['phone_key'] == b['phone_key']
+    same_name = bool(a['name_key']) and a['name_key'] == b['name_key']
+
+    if same_name and (same_email or same_phone):
+        return 'high'
+    if same_email and len(a['name_key'].split()) == len(b['name_key'].split()) \
+            and names_match(a['name_key'], b['name_key']):
+        # Typo'd name on the same inbox
+        return 'high'
+    if same_name or ((same_email or same_phone) and names_match(a['name_key'], b['name_key'])):
+        return 'possible'
+    return None
+
+
+def find_existing(agent, name, email, phone):
+    """
+    Create-time check: ONE indexed lookup on the agent's email/phone keys,
+    then the few hits are confirmed in Python.
+    """
+    from .models import Client
+
+    candidate = {
+        'name_key': normalize_name(name),
+        'email_key': normalize_email(email),
+        'phone_key': normalize_phone(phone),
+    }
+    lookup = Q()
+    if candidate['email_key']:
+        lookup |= Q(email_key=candidate['email_key'])
+    if candidate['phone_key']:
+        lookup |= Q(phone_key=candidate['phone_key'])
+    if not lookup:
+        return []
+
+    rows = Client.objects.filter(agent=agent).filter(lookup).values(
+        'id', 'name', 'email', 'phone', 'name_key', 'email_key', 'phone_key'
+    )[:MAX_BLOCK_SIZE]
+    return [
+        {'id': row['id'], 'name': row['name'], 'email': row['email'], 'phone': row['phone']}
+        for row in rows if is_duplicate(candidate, row) == 'high'
+    ]
+
+
+def find_duplicate_groups(agent):
+    """
+    Full scan of an agent's clients using blocking: every client is hashed
+    into its email, phone and name blocks, and pairs are only compared
+    inside a block. Only 'high' pairs are merged into groups (union-find);
+    a name-only match must never pull an unrelated client into a group.
+    'possible' pairs are reported on their own, for review.
+
+    Returns [{'clients': [ids, oldest first], 'confidence': 'high' | 'possible'}],
+    high groups first.
+    """
+    from .models import Client
+
+    rows = {
+        row['id']: row
+        for row in Client.objects.filter(agent=agent)
+        .values('id', 'name_key', 'email_key', 'phone_key').iterator(chunk_size=5000)
+    }
+
+    blocks = defaultdict(list)
+    for client_id, row in rows.items():
+        for field in ('email_key', 'phone_key', 'name_key'):
+            if row[field]:
+                blocks[(field, row[field])].append(client_id)
+
+    parent = {}
+
+    def find(x):
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    possible = set()
+    for members in blocks.values():
+        if len(members) < 2 or len(members) > MAX_BLOCK_SIZE:
+            continue
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                verdict = is_duplicate(rows[a], rows[b])
+                if verdict == 'high':
+                    root_a, root_b = find(a), find(b)
+                    if root_a != root_b:
+                        parent[max(root_a, root_b)] = min(root_a, root_b)
+                elif verdict == 'possible':
+                    possible.add((min(a, b), max(a, b)))
+
+    groups = defaultdict(list)
+    for client_id in list(parent):
+        groups[find(client_id)].append(client_id)
+
+    return [
+        {'clients': sorted(members), 'confidence': 'high'}
+        for _, members in sorted(groups.items())
+    ] + [
+        {'clients': [a, b], 'confidence': 'possible'}
+        # Already in the same high group: nothing left to review
+        for a, b in sorted(possible) if not (a in parent and b in parent and find(a) == find(b))
+    ]
+
+
+def merge_clients(primary, duplicate_ids):
+    """
+    Folds `duplicate_ids` into `primary`: their policies (live and
+    archived) move in bulk UPDATEs (commission lines hang off policies
+    and follow them), blank
+    fields on the primary are filled in, and the duplicates are deleted.
+    Returns the number of policies moved.
+    """
+    from .models import ArchivedPolicy, Client, Policy
+
+    duplicate_ids = [pk for pk in duplicate_ids if pk != primary.pk]
+    with transaction.atomic():
+        duplicates = list(Client.objects.select_for_update().filter(agent=primary.agent, pk__in=duplicate_ids))
+
+        moved = Policy.objects.filter(client__in=duplicates).update(client=primary)
+        # Deleting the duplicates would otherwise cascade to their history
+        ArchivedPolicy.objects.filter(client__in=duplicates).update(client=primary)
+
+        for duplicate in duplicates:
+            for field in ('age', 'address', 'email', 'phone'):
+                if not getattr(primary, field) and getattr(duplicate, field):
+                    setattr(primary, field, getattr(duplicate, field))
+        primary.save()
+
+        Client.objects.filter(pk__in=[d.pk for d in duplicates]).delete()
+
+    invalidate_book(primary.agent_id)
+    return moved
@@ -0,0 +1,180 @@
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from config.db_router import primary
+from .cache import book_version
+from .models import Policy
+
+HORIZON_MONTHS = 12
+
+# Policies that are expected to renew (and therefore earn) in the window
+PROJECTED_STATUSES = ['ACTIVE', 'PENDING']
+# Policies that count towards the historical lapse rate
+EXPOSED_STATUSES = ['ACTIVE', 'PENDING', 'LAPSED']
+
+
+def load_book(agent):
+    """
+    Pulls the forecast columns for an agent's book in ONE query and returns
+    them as NumPy arrays (one array per column, not one object per policy).
+    """
+    rows = Policy.objects.filter(client__agent=agent).values_list(
+        'premium_amount', 'renewal_date', 'status', 'carrier__name', 'policy_type'
+    )
+    columns = list(zip(*rows.iterator(chunk_size=5000)))
+    if not columns:
+        return None
+
+    premium, renewal_date, status, carrier, policy_type = columns
+    return {
+        'premium': np.array(premium, dtype=np.float64),
+        'renewal_month': np.array(renewal_date, dtype='datetime64[D]').astype('datetime64[M]').astype(np.int64),
+        'status': np.array(status),
+        'carrier': np.array(carrier),
+        'policy_type': np.array(policy_type),
+    }
+
+
+def _month_labels(start):
+    return [str(np.datetime64(int(start) + i, 'M')) for i in range(HORIZON_MONTHS)]
+
+
+def _money(values):
+    return np.round(values, 2).tolist()
+
+
+def compute_forecast(book, today):
+    """
+    Projects premium and commission for the next HORIZON_MONTHS months,
+    grouped by carrier and policy type, plus premium at risk.
+
+    Every step is a whole-array operation; the group-bys are bincounts over
+    a flat (carrier, policy_type, month) index.
+    """
+    start = np.datetime64(today, 'M').astype(np.int64)
+    months = _month_labels(start)
+
+    # 1. Group index: carrier x policy_type
+    carriers, carrier_idx = np.unique(book['carrier'], return_inverse=True)
+    types, type_idx = np.unique(book['policy_type'], return_inverse=True)
+    n_groups = len(carriers) * len(types)
+    group = carrier_idx * len(types) + type_idx
+
+    # 2. Historical lapse rate per group -> retention weight per policy
+    status = book['status']
+    lapsed = np.bincount(group, weights=(status == 'LAPSED'), minlength=n_groups)
+    exposed = np.bincount(group, weights=np.isin(status, EXPOSED_STATUSES), minlength=n_groups)
+    lapse_rate = np.divide(lapsed, exposed, out=np.zeros(n_groups), where=exposed > 0)
+    retention = 1.0 - lapse_rate[group]
+
+    # 3. Month of the next renewal. Overdue renewal dates roll to their next anniversary.
+    delta = book['renewal_month'] - start
+    offset = np.where(delta < 0, delta % 12, delta)
+    projected = np.isin(status, PROJECTED_STATUSES) & (offset < HORIZON_MONTHS)
+
+    rates = np.array([settings.COMMISSION_RATES.get(t, 0.0) for t in types])[type_idx]
+    premium = book['premium']
+    expected_premium = premium * retention
+    commission = expected_premium * rates
+
+    # 4. Group-by (group, month) via bincount over a flat index
+    cell = (group * HORIZON_MONTHS + offset)[projected]
+
+    def grid(weights):
+        flat = np.bincount(cell, weights=weights[projected], minlength=n_groups * HORIZON_MONTHS)
+        return flat.reshape(len(carriers), len(types), HORIZON_MONTHS)
+
+    premium_grid = grid(premium)
+    expected_grid = grid(expected_premium)
+    commission_grid = grid(commission)
+
+    # 5. Premium at risk: pending renewals weighted by their group's lapse rate
+    pending = status == 'PENDING'
+    pending_premium = np.bincount(carrier_idx[pending], weights=premium[pending], minlength=len(carriers))
+    at_risk = np.bincount(
+        carrier_idx[pending], weights=(premium * lapse_rate[group])[pending], minlength=len(carriers)
+    )
+
+    return {
+        'months': months,
+        'totals': {
+            'premium': _money(premium_grid.sum(axis=(0, 1))),
+            'expected_premium': _money(expected_grid.sum(axis=(0, 1))),
+            'commission': _money(commission_grid.sum(axis=(0, 1))),
+        },
+        'by_carrier': [
+            {
+                'carrier': str(name),
+                'premium': _money(premium_grid[i].sum(axis=0)),
+                'expected_premium': _money(expected_grid[i].sum(axis=0)),
+                'commission': _money(commission_grid[i].sum(axis=0)),
+            }
+            for i, name in enumerate(carriers)
+        ],
+        'by_policy_type': [
+            {
+                'policy_type': str(name),
+                'premium': _money(premium_grid[:, j].sum(axis=0)),
+                'expected_premium': _money(expected_grid[:, j].sum(axis=0)),
+                'commission': _money(commission_grid[:, j].sum(axis=0)),
+            }
+            for j, name in enumerate(types)
+        ],
+        'premium_at_risk': {
+            'pending_premium': round(float(pending_premium.sum()), 2),
+            'at_risk': round(float(at_risk.sum()), 2),
+            'by_carrier': [
+                {
+                    'carrier': str(name),
+                    'pending_premium': round(float(pending_premium[i]), 2),
+                    'at_risk': round(float(at_risk[i]), 2),
+                }
+                for i, name in enumerate(carriers) if pending_premium[i]
+            ],
+        },
+    }
+
+
+def empty_forecast(today):
+    start = np.datetime64(today, 'M').astype(np.int64)
+    zeros = [0.0] * HORIZON_MONTHS
+    return {
+        'months': _month_labels(start),
+        'totals': {'premium': zeros, 'expected_premium': zeros, 'commission': zeros},
+        'by_carrier': [],
+        'by_policy_type': [],
+        'premium_at_risk': {'pending_premium': 0.0, 'at_risk': 0.0, 'by_carrier': []},
+    }
+
+
+def build_forecast(agent, today):
+    book = load_book(agent)
+    forecast = compute_forecast(book, today) if book else empty_forecast(today)
+    forecast['as_of'] = today.isoformat()
+    return forecast
+
+
+def get_forecast(agent, use_cache=True):
+    """
+    Forecast for `agent`, cached until their policies change (or the day rolls over).
+
+    The cache key carries the book version from the primary, so a cached
+    forecast is computed on the primary too: a lagging replica would store
+    an old book under the new version. Uncached forecasts read wherever the
+    caller is routed (e.g. a replica under `reporting()`) and are not stored.
+    """
+    today = timezone.now().date()
+    if not use_cache:
+        return build_forecast(agent, today)
+
+    key = f"forecast:{agent.pk}:{book_version(agent.pk)}:{today.isoformat()}"
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    with primary():
+        forecast = build_forecast(agent, today)
+    cache.set(key, forecast, timeout=settings.FORECAST_CACHE_SECONDS)
+    return forecast
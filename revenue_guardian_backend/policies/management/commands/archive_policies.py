@@ -0,0 +1,36 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from policies.archive import archivable, archive_batch
+
+
+class Command(BaseCommand):
+    help = 'Moves lapsed/cancelled policies past the retention window into the archive, in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.POLICY_ARCHIVE_AFTER_DAYS,
+                            help='Archive closed policies that ended more than this many days ago')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Policies per transaction (keeps locks short)')
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be archived')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now().date() - timedelta(days=options['days'])
+        self.stdout.write(f"🗄️  Archiving closed policies that ended before {cutoff}...")
+
+        if options['dry_run']:
+            self.stdout.write(f"Would archive {archivable(cutoff).count()} policies.")
+            return
+
+        total = 0
+        while True:
+            moved = archive_batch(cutoff, options['batch_size'])
+            if not moved:
+                break
+            total += moved
+            self.stdout.write(f"   -> Archived {total} so far")
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Process Complete. Archived {total} policies."))
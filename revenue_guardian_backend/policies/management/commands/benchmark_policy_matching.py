@@ -0,0 +1,59 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from policies.matching import PolicyMatchIndex, normalize_policy_number
+
+RULES = {'strip_prefixes': ['MET']}
+
+
+def perturb(number, rng):
+    """
+    Prints a policy number the way a carrier statement might.
+    """
+    style = rng.randrange(5)
+    if style == 0:
+        return f"MET-{number}"                          # carrier prefix
+    if style == 1:
+        return f"{number[:3]}-{number[3:6]}-{number[6:]}"  # dashes
+    if style == 2:
+        return f"{number[:3]}00{number[3:]}"             # zero padding
+    if style == 3:
+        return number[:-2]                               # truncated
+    digits = list(number)
+    i = rng.randrange(3, len(digits))
+    digits[i] = str((int(digits[i]) + 1) % 10)           # typo
+    return ''.join(digits)
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks fuzzy policy-number matching on synthetic books (no database needed)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+        parser.add_argument('--lines', type=int, default=2000, help='Statement lines to match per size')
+        parser.add_argument('--seed', type=int, default=7)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        self.stdout.write(f"{'policies':>10} {'build (s)':>10} {'µs/line':>9} {'top-1 hit':>10}")
+
+        for size in options['sizes']:
+            numbers = [f"POL{n}" for n in rng.sample(range(10 ** 9, 10 ** 10), size)]
+            rows = [(i, normalize_policy_number(n, RULES), '') for i, n in enumerate(numbers)]
+
+            started = time.perf_counter()
+            index = PolicyMatchIndex(rows)
+            build_seconds = time.perf_counter() - started
+
+            targets = [rng.randrange(size) for _ in range(options['lines'])]
+            printed = [normalize_policy_number(perturb(numbers[t], rng), RULES) for t in targets]
+
+            started = time.perf_counter()
+            hits = 0
+            for target, key in zip(targets, printed):
+                candidates = index.candidates(key, limit=3)
+                hits += bool(candidates) and candidates[0][0] == target
+            per_line = (time.perf_counter() - started) / len(targets) * 1e6
+
+            self.stdout.write(f"{size:>10} {build_seconds:>10.2f} {per_line:>9.0f} {hits / len(targets):>10.1%}")
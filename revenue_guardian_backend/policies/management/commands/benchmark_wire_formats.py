@@ -0,0 +1,104 @@
+import gzip
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from config.renderers import MessagePackRenderer
+from policies.models import Carrier, Client, Policy
+from policies.serializers import ClientSerializer, PolicySerializer
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+FIRST_NAMES = ['Jane', 'John', 'Priya', 'Rahul', 'Maria', 'Wei', 'Fatima', 'Carlos', 'Aisha', 'Tom']
+LAST_NAMES = ['Doe', 'Patel', 'Smith', 'Garcia', 'Chen', 'Khan', 'Silva', 'Brown', 'Shah', 'Lee']
+CARRIERS = ['MetLife', 'Allianz', 'AXA', 'Prudential', 'Aviva', 'Zurich']
+
+
+def synthetic_book(size, rng):
+    """
+    Unsaved clients and policies shaped like a real book (~3 policies per client).
+    """
+    carriers = [
+        Carrier(id=i + 1, name=name, support_email=f"support@{name.lower()}.com")
+        for i, name in enumerate(CARRIERS)
+    ]
+    clients = []
+    for i in range(max(size // 3, 1)):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        client = Client(
+            id=i + 1, name=f"{first} {last}", email=f"{first}.{last}{i}@example.com".lower(),
+            phone=f"+1 555 {rng.randrange(10 ** 7):07d}", age=rng.randrange(18, 90),
+            gender=rng.choice('MFO'), address=f"{rng.randrange(1, 999)} Main Street, Springfield",
+            created_at=datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=i),
+        )
+        client.policy_count = 3
+        clients.append(client)
+
+    policies = []
+    for i in range(size):
+        start = date(2025, 1, 1) + timedelta(days=rng.randrange(365))
+        policies.append(Policy(
+            id=i + 1, policy_number=f"POL{rng.randrange(10 ** 9, 10 ** 10)}",
+            client=clients[i % len(clients)], carrier=rng.choice(carriers),
+            policy_type=rng.choice(['LIFE', 'HEALTH', 'AUTO', 'HOME']),
+            status=rng.choice(['ACTIVE', 'ACTIVE', 'ACTIVE', 'PENDING', 'LAPSED']),
+            premium_amount=Decimal(rng.randrange(20000, 500000)) / 100,
+            sum_insured=Decimal(rng.randrange(100, 5000) * 1000),
+            start_date=start, end_date=start + timedelta(days=365), renewal_date=start + timedelta(days=365),
+        ))
+    return clients, policies
+
+
+def timed(func, *args):
+    started = time.process_time()
+    result = func(*args)
+    return result, (time.process_time() - started) * 1000
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks bytes on the wire and server CPU per response format for /api/policies/ and /api/clients/ (no database needed)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000, 20000], help='Policies per book')
+        parser.add_argument('--seed', type=int, default=7)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        encoders = [('identity', lambda body: body)]
+        encoders.append(('gzip', lambda body: gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)))
+        if brotli:
+            encoders.append(('br', lambda body: brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)))
+        renderers = [('json', JSONRenderer()), ('msgpack', MessagePackRenderer())]
+
+        for size in options['sizes']:
+            clients, policies = synthetic_book(size, rng)
+            for endpoint, serializer_class, objects in (
+                ('/api/policies/', PolicySerializer, policies),
+                ('/api/clients/', ClientSerializer, clients),
+            ):
+                data, serialize_ms = timed(lambda: serializer_class(objects, many=True).data)
+                self.stdout.write(self.style.MIGRATE_HEADING(
+                    f"{endpoint} ({len(objects):,} rows, serializer {serialize_ms:,.0f} ms)"
+                ))
+                self.stdout.write(f"{'format':<18}{'bytes':>12}{'ratio':>8}{'render ms':>11}{'encode ms':>11}")
+
+                baseline = None
+                for format_name, renderer in renderers:
+                    body, render_ms = timed(renderer.render, data)
+                    for encoding, encode in encoders:
+                        wire, encode_ms = timed(encode, body)
+                        baseline = baseline or len(wire)
+                        self.stdout.write(
+                            f"{format_name + '+' + encoding:<18}{len(wire):>12,}{len(wire) / baseline:>8.2f}"
+                            f"{render_ms:>11.1f}{encode_ms:>11.1f}"
+                        )
+                self.stdout.write('')
+
+        self.stdout.write(self.style.SUCCESS("✅ Process Complete."))
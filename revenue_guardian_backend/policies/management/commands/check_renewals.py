@@ -2,6 +2,7 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from django.core.mail import send_mail
 from django.conf import settings
+from notifications.events import publish
 from policies.models import Policy
 from datetime import timedelta
 
@@ -24,7 +25,7 @@ class Command(BaseCommand):
             expiring_policies = Policy.objects.filter(
                 renewal_date=target_date,
                 status__in=['ACTIVE', 'PENDING']
-            )
+            ).select_related('client__agent', 'carrier')
 
             for policy in expiring_policies:
                 # 1. Update Status to PENDING (if not already)
@@ -37,6 +38,16 @@ class Command(BaseCommand):
                 self.send_renewal_alert(policy, days)
                 total_alerts += 1
 
+                # 3. Push to the agent's open dashboards (/api/events/)
+                publish(policy.client.agent_id, 'policy.pending', {
+                    'policy': policy.pk,
+                    'policy_number': policy.policy_number,
+                    'client': policy.client.name,
+                    'status': policy.status,
+                    'renewal_date': policy.renewal_date.isoformat(),
+                    'days_left': days,
+                })
+
         self.stdout.write(self.style.SUCCESS(f"✅ Process Complete. Sent {total_alerts} alerts."))
 
     def send_renewal_alert(self, policy, days_left):
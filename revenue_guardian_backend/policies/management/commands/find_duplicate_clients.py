@@ -0,0 +1,37 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from policies.dedupe import find_duplicate_groups, merge_clients
+from policies.models import Client
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Scans every agent book for duplicate clients (blocking on email, phone and name)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--agent', help='Only scan this username')
+        parser.add_argument('--merge', action='store_true',
+                            help='Merge high-confidence groups into their oldest client '
+                                 '(possible pairs are only reported)')
+
+    def handle(self, *args, **options):
+        agents = User.objects.filter(clients__isnull=False).distinct()
+        if options['agent']:
+            agents = agents.filter(username=options['agent'])
+
+        total_groups = total_merged = 0
+        for agent in agents.iterator():
+            for group in find_duplicate_groups(agent):
+                total_groups += 1
+                self.stdout.write(f"{agent.username}: clients {group['clients']} ({group['confidence']})")
+
+                if options['merge'] and group['confidence'] == 'high':
+                    primary_id, *duplicate_ids = group['clients']
+                    moved = merge_clients(Client.objects.get(pk=primary_id), duplicate_ids)
+                    total_merged += len(duplicate_ids)
+                    self.stdout.write(f"   -> Merged into {primary_id}, moved {moved} policies")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Scan Complete. Found {total_groups} groups, merged {total_merged} clients."
+        ))
@@ -0,0 +1,42 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from config.db_router import reporting
+from policies.forecast import get_forecast
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Prints the 12-month premium/commission forecast and premium at risk for agents"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--agent', help='Username (default: every agent with clients)')
+        parser.add_argument('--no-cache', action='store_true', help='Recompute from the replica, bypassing (and not updating) the cache')
+
+    def handle(self, *args, **options):
+        # Reporting workload: read from a replica when one is configured
+        with reporting():
+            self.report(options)
+
+    def report(self, options):
+        if options['agent']:
+            agents = User.objects.filter(username=options['agent'])
+            if not agents.exists():
+                raise CommandError(f"No agent named {options['agent']}")
+        else:
+            agents = User.objects.filter(clients__isnull=False).distinct()
+
+        for agent in agents:
+            forecast = get_forecast(agent, use_cache=not options['no_cache'])
+            totals = forecast['totals']
+            risk = forecast['premium_at_risk']
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f"📈 {agent.username} (as of {forecast['as_of']})"))
+            self.stdout.write(f"{'Month':<10}{'Premium':>14}{'Expected':>14}{'Commission':>14}")
+            for month, premium, expected, commission in zip(
+                forecast['months'], totals['premium'], totals['expected_premium'], totals['commission']
+            ):
+                self.stdout.write(f"{month:<10}{premium:>14,.2f}{expected:>14,.2f}{commission:>14,.2f}")
+            self.stdout.write(
+                f"Pending premium: ${risk['pending_premium']:,.2f}   At risk: ${risk['at_risk']:,.2f}\n"
+            )
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from policies.matching import normalize_policy_number
+from policies.models import Carrier, Policy
+
+BATCH_SIZE = 2000
+
+
+class Command(BaseCommand):
+    help = "Recomputes normalized policy-number keys (run after editing a carrier's policy_number_rules)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--carrier', type=int, help='Only rebuild keys for this carrier ID')
+
+    def handle(self, *args, **options):
+        carriers = Carrier.objects.all()
+        if options['carrier']:
+            carriers = carriers.filter(pk=options['carrier'])
+
+        total = 0
+        for carrier in carriers:
+            rules = carrier.policy_number_rules
+            batch = []
+            policies = Policy.objects.filter(carrier=carrier).only(
+                'policy_number', 'prev_policy_number', 'policy_number_key', 'prev_policy_number_key'
+            )
+            for policy in policies.iterator(chunk_size=BATCH_SIZE):
+                key = normalize_policy_number(policy.policy_number, rules)
+                prev_key = normalize_policy_number(policy.prev_policy_number, rules)
+                # Only write rows whose key actually changes
+                if (key, prev_key) != (policy.policy_number_key, policy.prev_policy_number_key):
+                    policy.policy_number_key, policy.prev_policy_number_key = key, prev_key
+                    batch.append(policy)
+                if len(batch) >= BATCH_SIZE:
+                    total += Policy.objects.bulk_update(batch, ['policy_number_key', 'prev_policy_number_key'])
+                    batch = []
+            total += Policy.objects.bulk_update(batch, ['policy_number_key', 'prev_policy_number_key'])
+            self.stdout.write(f"Rebuilt keys for {carrier.name}")
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Process Complete. Updated {total} policies."))
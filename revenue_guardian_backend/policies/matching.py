@@ -0,0 +1,138 @@
+import bisect
+import heapq
+import re
+from collections import Counter, defaultdict
+
+NON_ALNUM_RE = re.compile(r'[^A-Z0-9]')
+# Leading zeros of a digit run: "POL000123" -> "POL123"
+ZERO_PADDING_RE = re.compile(r'(?<![0-9])0+(?=[0-9])')
+
+NGRAM_SIZE = 4
+
+# Upper bound on posting-list entries read per lookup. Lookups visit the
+# rarest grams first and stop at this budget, so the cost of matching one
+# line stays flat as the policy table grows.
+POSTING_BUDGET = 2000
+
+# Candidates re-scored exactly after the blocking pass
+RESCORE_LIMIT = 50
+
+# Truncated numbers shorter than this are too ambiguous to prefix-match
+MIN_PREFIX_LENGTH = 6
+
+
+def _clean(value):
+    return NON_ALNUM_RE.sub('', (value or '').upper())
+
+
+def normalize_policy_number(value, rules=None):
+    """
+    Reduces a printed policy number to a comparison key.
+
+    Generic rules: upper-case, drop punctuation/whitespace, drop zero padding.
+    Per-carrier `rules` (Carrier.policy_number_rules) may add:
+      {"strip_prefixes": ["MET", "ML"], "strip_suffixes": ["A"], "keep_zero_padding": false}
+    """
+    rules = rules or {}
+    key = _clean(value)
+    for prefix in sorted((_clean(p) for p in rules.get('strip_prefixes', [])), key=len, reverse=True):
+        if prefix and key.startswith(prefix) and len(key) > len(prefix):
+            key = key[len(prefix):]
+            break
+    for suffix in sorted((_clean(s) for s in rules.get('strip_suffixes', [])), key=len, reverse=True):
+        if suffix and key.endswith(suffix) and len(key) > len(suffix):
+            key = key[:-len(suffix)]
+            break
+    if not rules.get('keep_zero_padding'):
+        key = ZERO_PADDING_RE.sub('', key)
+    return key
+
+
+def ngrams(key):
+    padded = f"^{key}$"
+    return {padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)}
+
+
+class PolicyMatchIndex:
+    """
+    In-memory blocking index over one carrier's policy keys.
+
+    Built once per statement in O(policies). Each line is then only compared
+    with policies that share its exact key, a key prefix (truncation) or one
+    of its rarest n-grams, never with the whole table.
+    """
+
+    def __init__(self, rows):
+        # rows: iterable of (policy_id, policy_number_key, prev_policy_number_key)
+        self.exact = defaultdict(list)
+        self.previous = defaultdict(list)
+        self.keys = {}
+        self.postings = defaultdict(list)
+
+        for policy_id, key, prev_key in rows:
+            if not key:
+                continue
+            self.exact[key].append(policy_id)
+            if prev_key:
+                self.previous[prev_key].append(policy_id)
+            self.keys[policy_id] = key
+            for gram in ngrams(key):
+                self.postings[gram].append(policy_id)
+
+        # Sorted (key, id) pairs: truncated numbers are a bisect away
+        self.sorted_keys = sorted((key, policy_id) for policy_id, key in self.keys.items())
+
+    def _prefix_matches(self, key):
+        start = bisect.bisect_left(self.sorted_keys, (key,))
+        matches = []
+        for policy_key, policy_id in self.sorted_keys[start:start + RESCORE_LIMIT + 1]:
+            if not policy_key.startswith(key):
+                break
+            matches.append(policy_id)
+        # Too many policies share this prefix to call it a truncation
+        return matches if len(matches) <= RESCORE_LIMIT else []
+
+    def _ngram_block(self, query_grams):
+        postings = sorted((self.postings.get(gram, ()) for gram in query_grams), key=len)
+        shared = Counter()
+        budget = POSTING_BUDGET
+        for ids in postings:
+            if not ids:
+                continue
+            if len(ids) > budget and shared:
+                break
+            shared.update(ids[:budget])
+            budget -= len(ids)
+        return [policy_id for policy_id, _ in shared.most_common(RESCORE_LIMIT)]
+
+    def candidates(self, key, limit=5, min_score=0.5):
+        """
+        Returns up to `limit` (policy_id, score, reason) tuples, best first.
+        """
+        if not key:
+            return []
+
+        scores = {}
+
+        def offer(policy_id, score, reason):
+            if score > scores.get(policy_id, (0, ''))[0]:
+                scores[policy_id] = (round(score, 3), reason)
+
+        for policy_id in self.exact.get(key, ()):
+            offer(policy_id, 1.0, 'exact')
+        for policy_id in self.previous.get(key, ()):
+            offer(policy_id, 0.95, 'previous_number')
+
+        if len(key) >= MIN_PREFIX_LENGTH:
+            for policy_id in self._prefix_matches(key):
+                # Carrier truncated the number
+                offer(policy_id, 0.9 * len(key) / len(self.keys[policy_id]) + 0.05, 'truncated')
+
+        query_grams = ngrams(key)
+        for policy_id in self._ngram_block(query_grams):
+            # Dice coefficient on the full n-gram sets
+            policy_grams = ngrams(self.keys[policy_id])
+            offer(policy_id, 2 * len(query_grams & policy_grams) / (len(query_grams) + len(policy_grams)), 'ngram')
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1][0])
+        return [(policy_id, score, reason) for policy_id, (score, reason) in best if score >= min_score]
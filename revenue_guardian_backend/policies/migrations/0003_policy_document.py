@@ -0,0 +1,20 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0001_initial'),
+        ('policies', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='policy',
+            name='document',
+            field=models.ForeignKey(blank=True, help_text='Content-addressed copy of the policy document', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='policies', to='documents.document'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:04
+
+from django.db import migrations, models
+
+from policies.matching import normalize_policy_number
+
+
+def populate_keys(apps, schema_editor):
+    Policy = apps.get_model('policies', 'Policy')
+    batch = []
+    for policy in Policy.objects.only('policy_number', 'prev_policy_number').iterator(chunk_size=2000):
+        policy.policy_number_key = normalize_policy_number(policy.policy_number)
+        policy.prev_policy_number_key = normalize_policy_number(policy.prev_policy_number)
+        batch.append(policy)
+        if len(batch) >= 2000:
+            Policy.objects.bulk_update(batch, ['policy_number_key', 'prev_policy_number_key'])
+            batch = []
+    Policy.objects.bulk_update(batch, ['policy_number_key', 'prev_policy_number_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('policies', '0003_policy_document'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='carrier',
+            name='policy_number_rules',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='policy',
+            name='policy_number_key',
+            field=models.CharField(blank=True, db_index=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='policy',
+            name='prev_policy_number_key',
+            field=models.CharField(blank=True, db_index=True, max_length=100),
+        ),
+        migrations.RunPython(populate_keys, migrations.RunPython.noop),
+    ]
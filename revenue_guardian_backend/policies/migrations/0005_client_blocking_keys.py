@@ -0,0 +1,59 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+from policies.dedupe import normalize_email, normalize_name, normalize_phone
+
+
+def populate_keys(apps, schema_editor):
+    Client = apps.get_model('policies', 'Client')
+    batch = []
+    for client in Client.objects.only('name', 'email', 'phone').iterator(chunk_size=2000):
+        client.name_key = normalize_name(client.name)
+        client.email_key = normalize_email(client.email)
+        client.phone_key = normalize_phone(client.phone)
+        batch.append(client)
+        if len(batch) >= 2000:
+            Client.objects.bulk_update(batch, ['name_key', 'email_key', 'phone_key'])
+            batch = []
+    Client.objects.bulk_update(batch, ['name_key', 'email_key', 'phone_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('policies', '0004_policy_number_keys'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='email_key',
+            field=models.CharField(blank=True, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='name_key',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='phone_key',
+            field=models.CharField(blank=True, max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['agent', 'email_key'], name='client_agent_email_key'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['agent', 'phone_key'], name='client_agent_phone_key'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['agent', 'name_key'], name='client_agent_name_key'),
+        ),
+        migrations.RunPython(populate_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0001_initial'),
+        ('policies', '0005_client_blocking_keys'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='policy',
+            index=models.Index(fields=['status', 'renewal_date'], name='policy_status_renewal'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0001_initial'),
+        ('policies', '0006_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedPolicy',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('policy_number', models.CharField(db_index=True, max_length=100)),
+                ('prev_policy_number', models.CharField(blank=True, max_length=100, null=True)),
+                ('policy_type', models.CharField(choices=[('LIFE', 'Life Insurance'), ('HEALTH', 'Health Insurance'), ('AUTO', 'Vehicle Insurance'), ('HOME', 'Home Insurance')], max_length=20)),
+                ('status', models.CharField(choices=[('ACTIVE', 'Active'), ('LAPSED', 'Lapsed'), ('CANCELLED', 'Cancelled'), ('PENDING', 'Pending Renewal')], max_length=20)),
+                ('premium_amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('sum_insured', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('renewal_date', models.DateField()),
+                ('policy_file', models.FileField(blank=True, null=True, upload_to='policy_docs/')),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('carrier', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_policies', to='policies.carrier')),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_policies', to='policies.client')),
+                ('document', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='archived_policies', to='documents.document')),
+            ],
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('policies', '0007_archived_policy'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='client',
+            name='email_key',
+            field=models.CharField(blank=True, db_index=True, max_length=254),
+        ),
+        migrations.AlterField(
+            model_name='client',
+            name='name_key',
+            field=models.CharField(blank=True, db_index=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='client',
+            name='phone_key',
+            field=models.CharField(blank=True, db_index=True, max_length=20),
+        ),
+    ]
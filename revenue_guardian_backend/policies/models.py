@@ -1,5 +1,8 @@
 from django.db import models
 from django.conf import settings 
+from .cache import invalidate_book
+from .dedupe import normalize_email, normalize_name, normalize_phone
+from .matching import normalize_policy_number
 
 class Client(models.Model):
     """
@@ -16,15 +19,41 @@ class Client(models.Model):
     age = models.PositiveIntegerField(null=True, blank=True)
     gender = models.CharField(max_length=1, choices=GENDER_CHOICES)
     address = models.TextField(blank=True)
+
+    # Blocking keys for duplicate detection (see policies/dedupe.py).
+    # Also indexed alone: admin search prefix-matches them across all agents.
+    name_key = models.CharField(max_length=255, blank=True, db_index=True)
+    email_key = models.CharField(max_length=254, blank=True, db_index=True)
+    phone_key = models.CharField(max_length=20, blank=True, db_index=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['agent', 'email_key'], name='client_agent_email_key'),
+            models.Index(fields=['agent', 'phone_key'], name='client_agent_phone_key'),
+            models.Index(fields=['agent', 'name_key'], name='client_agent_name_key'),
+        ]
+
     def __str__(self):
         return f"{self.name} - {self.email}"
 
+    def save(self, *args, **kwargs):
+        self.name_key = normalize_name(self.name)
+        self.email_key = normalize_email(self.email)
+        self.phone_key = normalize_phone(self.phone)
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        # Cascades to policies without calling Policy.delete()
+        invalidate_book(self.agent_id)
+        return super().delete(*args, **kwargs)
+
     @property
     def total_policies(self):
-        return self.policies.count()
+        # List views pre-fill policy_count in bulk; a lone client counts on demand
+        count = getattr(self, 'policy_count', None)
+        return self.policies.count() if count is None else count
 
 
 class Carrier(models.Model):
@@ -33,6 +62,10 @@ class Carrier(models.Model):
     """
     name = models.CharField(max_length=100)
     support_email = models.EmailField(blank=True)
+
+    # How this carrier prints policy numbers on statements, e.g.
+    # {"strip_prefixes": ["MET-"], "strip_suffixes": [], "keep_zero_padding": false}
+    policy_number_rules = models.JSONField(default=dict, blank=True)
     
     def __str__(self):
         return self.name
@@ -63,6 +96,10 @@ class Policy(models.Model):
     # Core Data
     policy_number = models.CharField(max_length=100, unique=True)
     prev_policy_number = models.CharField(max_length=100, blank=True, null=True)
+
+    # Normalized forms for matching statement lines (see policies/matching.py)
+    policy_number_key = models.CharField(max_length=100, blank=True, db_index=True)
+    prev_policy_number_key = models.CharField(max_length=100, blank=True, db_index=True)
     policy_type = models.CharField(max_length=20, choices=POLICY_TYPES)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='ACTIVE')
     
@@ -77,6 +114,61 @@ class Policy(models.Model):
     
     # Docs
     policy_file = models.FileField(upload_to='policy_docs/', blank=True, null=True)
+    document = models.ForeignKey(
+        'documents.Document', on_delete=models.PROTECT, null=True, blank=True, related_name='policies',
+        help_text="Content-addressed copy of the policy document"
+    )
+
+    class Meta:
+        indexes = [
+            # Status filters (admin, renewal sweeps) ordered by renewal date
+            models.Index(fields=['status', 'renewal_date'], name='policy_status_renewal'),
+        ]
+
+    def __str__(self):
+        return f"{self.policy_number} ({self.client.name})"
+
+    def save(self, *args, **kwargs):
+        # Keep the matching keys in step with the printed numbers
+        rules = self.carrier.policy_number_rules
+        self.policy_number_key = normalize_policy_number(self.policy_number, rules)
+        self.prev_policy_number_key = normalize_policy_number(self.prev_policy_number, rules)
+        super().save(*args, **kwargs)
+        invalidate_book(self.client.agent_id)
+
+    def delete(self, *args, **kwargs):
+        invalidate_book(self.client.agent_id)
+        return super().delete(*args, **kwargs)
+
+
+class ArchivedPolicy(models.Model):
+    """
+    Cold storage for closed policies past the retention window (see
+    policies/archive.py). Keeps the id the policy had while live, so old
+    links and commission lines (CommissionTransaction.archived_policy)
+    still resolve. Read with ?include_history=true.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    client = models.ForeignKey(Client, on_delete=models.CASCADE, related_name='archived_policies')
+    carrier = models.ForeignKey(Carrier, on_delete=models.PROTECT, related_name='archived_policies')
+
+    policy_number = models.CharField(max_length=100, db_index=True)
+    prev_policy_number = models.CharField(max_length=100, blank=True, null=True)
+    policy_type = models.CharField(max_length=20, choices=Policy.POLICY_TYPES)
+    status = models.CharField(max_length=20, choices=Policy.STATUS_CHOICES)
+
+    premium_amount = models.DecimalField(max_digits=12, decimal_places=2)
+    sum_insured = models.DecimalField(max_digits=15, decimal_places=2)
+
+    start_date = models.DateField()
+    end_date = models.DateField()
+    renewal_date = models.DateField()
+
+    policy_file = models.FileField(upload_to='policy_docs/', blank=True, null=True)
+    document = models.ForeignKey(
+        'documents.Document', on_delete=models.PROTECT, null=True, blank=True, related_name='archived_policies'
+    )
+    archived_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"{self.policy_number} ({self.client.name})"
\ No newline at end of file
+        return f"{self.policy_number} (archived)"
@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import Client, Policy, Carrier
+from documents.serializers import AgentDocumentField
+from .models import ArchivedPolicy, Client, Policy, Carrier
 
 class CarrierSerializer(serializers.ModelSerializer):
     class Meta:
@@ -23,6 +24,9 @@ class PolicySerializer(serializers.ModelSerializer):
     # These allow us to see the NAMES in the JSON response, not just IDs
     client_details = ClientSerializer(source='client', read_only=True)
     carrier_details = CarrierSerializer(source='carrier', read_only=True)
+
+    # ID of a Document produced by the resumable upload API (/api/uploads/)
+    document = AgentDocumentField(required=False, allow_null=True)
     
     class Meta:
         model = Policy
@@ -30,7 +34,7 @@ class PolicySerializer(serializers.ModelSerializer):
             'id', 'policy_number', 'client', 'carrier', 
             'client_details', 'carrier_details', # Nested data for display
             'policy_type', 'status', 'premium_amount', 
-            'sum_insured', 'start_date', 'end_date', 'renewal_date', 'policy_file'
+            'sum_insured', 'start_date', 'end_date', 'renewal_date', 'policy_file', 'document'
         ]
 
     def validate(self, data):
@@ -52,4 +56,22 @@ class PolicySerializer(serializers.ModelSerializer):
             if start_date > end_date:
                 raise serializers.ValidationError("End date must be after start date.")
         
-        return data
\ No newline at end of file
+        return data
+
+
+class ArchivedPolicySerializer(serializers.ModelSerializer):
+    """
+    Read-only: an archived policy in the same shape as PolicySerializer, plus archived_at.
+    """
+    client_details = ClientSerializer(source='client', read_only=True)
+    carrier_details = CarrierSerializer(source='carrier', read_only=True)
+
+    class Meta:
+        model = ArchivedPolicy
+        fields = [
+            'id', 'policy_number', 'client', 'carrier',
+            'client_details', 'carrier_details',
+            'policy_type', 'status', 'premium_amount',
+            'sum_insured', 'start_date', 'end_date', 'renewal_date', 'policy_file', 'document', 'archived_at'
+        ]
+        read_only_fields = fields
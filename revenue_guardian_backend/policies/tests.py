@@ -1,3 +1,329 @@
-from django.test import TestCase
+import json
+from datetime import date, datetime, timezone
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+import msgpack
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from commissions.models import CommissionStatement
+from commissions.reconciliation import apply_revision
+from config.db_router import PrimaryReplicaRouter, reporting
+from .dedupe import find_duplicate_groups, is_duplicate, merge_clients, normalize_name
+from .cache import book_version
+from .forecast import get_forecast, load_book
+from .matching import PolicyMatchIndex, normalize_policy_number
+from .models import ArchivedPolicy, Carrier, Client, Policy
+
+User = get_user_model()
+
+
+class NormalizePolicyNumberTests(SimpleTestCase):
+    def test_generic_rules(self):
+        self.assertEqual(normalize_policy_number(' pol-000123 '), 'POL123')
+
+    def test_carrier_prefix(self):
+        rules = {'strip_prefixes': ['MET-']}
+        self.assertEqual(normalize_policy_number('MET-POL-123', rules), 'POL123')
+
+
+class PolicyMatchIndexTests(SimpleTestCase):
+    def setUp(self):
+        rows = [
+            (1, 'POL4418207391', 'POL3312207391'),
+            (2, 'POL4418207392', ''),
+            (3, 'POL9900123456', ''),
+        ]
+        self.index = PolicyMatchIndex(rows)
+
+    def test_exact_and_previous_numbers(self):
+        self.assertEqual(self.index.candidates('POL4418207391')[0][:2], (1, 1.0))
+        self.assertEqual(self.index.candidates('POL3312207391')[0][2], 'previous_number')
+
+    def test_truncated_number_ranks_the_true_policy_first(self):
+        ranked = [policy_id for policy_id, _, _ in self.index.candidates('POL99001234')]
+        self.assertEqual(ranked[0], 3)
+
+    def test_typo_still_finds_candidates(self):
+        ranked = [policy_id for policy_id, _, _ in self.index.candidates('POL9900128456')]
+        self.assertEqual(ranked[0], 3)
+
+
+class RevenueForecastTests(TestCase):
+    def setUp(self):
+        self.agent = User.objects.create_user(username='agent', password='pw')
+        self.carrier = Carrier.objects.create(name='Allianz')
+        self.client_record = Client.objects.create(
+            agent=self.agent, name='Jane Doe', email='jane@example.com', phone='555', gender='F'
+        )
+        self.today = mock.patch('policies.forecast.timezone.now', return_value=datetime(2026, 1, 10, tzinfo=timezone.utc))
+        self.today.start()
+        self.addCleanup(self.today.stop)
+
+    def add_policy(self, number, status, renewal_date, premium=1200):
+        return Policy.objects.create(
+            client=self.client_record, carrier=self.carrier, policy_number=number, policy_type='LIFE',
+            status=status, premium_amount=premium, sum_insured=100000, start_date=date(2025, 1, 1),
+            end_date=date(2027, 1, 1), renewal_date=renewal_date,
+        )
+
+    def test_projects_renewals_into_their_month(self):
+        self.add_policy('A-1', 'ACTIVE', date(2026, 3, 1))
+        self.add_policy('A-2', 'ACTIVE', date(2025, 2, 15))  # overdue -> next anniversary
+        self.add_policy('A-3', 'CANCELLED', date(2026, 3, 1))
+
+        forecast = get_forecast(self.agent, use_cache=False)
+
+        self.assertEqual(forecast['months'][0], '2026-01')
+        self.assertEqual(forecast['totals']['premium'][1], 1200.0)  # Feb
+        self.assertEqual(forecast['totals']['premium'][2], 1200.0)  # Mar
+        self.assertEqual(forecast['totals']['commission'][2], 120.0)
+
+    def test_premium_at_risk_uses_lapse_history(self):
+        self.add_policy('A-1', 'PENDING', date(2026, 2, 1))
+        self.add_policy('A-2', 'LAPSED', date(2025, 2, 1))
+        self.add_policy('A-3', 'ACTIVE', date(2026, 6, 1))
+        self.add_policy('A-4', 'ACTIVE', date(2026, 7, 1))
+
+        risk = get_forecast(self.agent, use_cache=False)['premium_at_risk']
+
+        self.assertEqual(risk['pending_premium'], 1200.0)
+        self.assertEqual(risk['at_risk'], 300.0)  # 1 lapsed of 4 exposed
+
+    def test_cache_is_invalidated_when_policies_change(self):
+        self.add_policy('A-1', 'ACTIVE', date(2026, 3, 1))
+        first = get_forecast(self.agent)
+
+        self.add_policy('A-2', 'ACTIVE', date(2026, 3, 1))
+
+        self.assertEqual(first['totals']['premium'][2], 1200.0)
+        self.assertEqual(get_forecast(self.agent)['totals']['premium'][2], 2400.0)
+
+    @override_settings(DATABASE_REPLICAS=['replica'])
+    @mock.patch('config.db_router.is_healthy', return_value=True)
+    def test_cached_forecast_reads_the_primary_under_reporting(self, _):
+        self.add_policy('A-1', 'ACTIVE', date(2026, 3, 1))
+        routed = []
+
+        def spy(agent):
+            # Outside the test's transaction, which would pin every read to the primary
+            with mock.patch.object(connection, 'in_atomic_block', False):
+                routed.append(PrimaryReplicaRouter().db_for_read(Policy))
+            return load_book(agent)
+
+        with mock.patch('policies.forecast.load_book', side_effect=spy), reporting():
+            get_forecast(self.agent)
+            get_forecast(self.agent, use_cache=False)
+
+        self.assertEqual(routed, ['default', 'replica'])
+
+
+class DuplicateClientTests(APITestCase):
+    def setUp(self):
+        self.agent = User.objects.create_user(username='agent', password='pw')
+        self.client.force_authenticate(self.agent)
+        self.jane = Client.objects.create(
+            agent=self.agent, name='Jane Doe', email='Jane.Doe@example.com', phone='+1 (555) 010-0000', gender='F'
+        )
+
+    def test_create_rejects_likely_duplicate(self):
+        payload = {'name': 'Doe, Jane', 'email': 'jane.doe+work@example.com', 'phone': '5550100000', 'gender': 'F'}
+
+        response = self.client.post('/api/clients/', payload)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['matches'][0]['id'], self.jane.pk)
+
+        response = self.client.post('/api/clients/?allow_duplicate=true', payload)
+        self.assertEqual(response.status_code, 201)
+
+    def test_spouse_sharing_a_phone_is_not_a_duplicate(self):
+        Client.objects.create(agent=self.agent, name='John Doe', email='john@example.com', phone='5550100000', gender='M')
+
+        self.assertEqual(find_duplicate_groups(self.agent), [])
+
+    def test_household_members_sharing_a_phone_are_only_possible(self):
+        for name, other in (('John Doe', 'Joan Doe'), ('Jake Doe', 'Jane Doe'), ('Mark Lee', 'Mary Lee'),
+                            ('Jane Doe', 'Jane Doe Jr')):
+            with self.subTest(name=name, other=other):
+                a = {'name_key': normalize_name(name), 'email_key': 'a@example.com', 'phone_key': '5550100000'}
+                b = {'name_key': normalize_name(other), 'email_key': 'b@example.com', 'phone_key': '5550100000'}
+                self.assertEqual(is_duplicate(a, b), 'possible')
+
+        a = {'name_key': normalize_name('Jane Doe'), 'email_key': 'jane@example.com', 'phone_key': ''}
+        self.assertEqual(is_duplicate(a, {**a, 'name_key': normalize_name('Jnae Doe')}), 'high')
+        self.assertEqual(is_duplicate(a, {**a, 'name_key': normalize_name('Jane Doe Jr')}), 'possible')
+
+    def test_name_only_match_does_not_join_a_high_group(self):
+        twin = Client.objects.create(agent=self.agent, name='Jane Doe', email='jane.doe@example.com', phone='', gender='F')
+        namesake = Client.objects.create(agent=self.agent, name='Jane Doe', email='other@example.com', phone='1', gender='F')
+
+        self.assertEqual(find_duplicate_groups(self.agent), [
+            {'clients': [self.jane.pk, twin.pk], 'confidence': 'high'},
+            {'clients': [self.jane.pk, namesake.pk], 'confidence': 'possible'},
+            {'clients': [twin.pk, namesake.pk], 'confidence': 'possible'},
+        ])
+
+    def test_scan_and_merge(self):
+        carrier = Carrier.objects.create(name='Allianz')
+        twin = Client.objects.create(agent=self.agent, name='Jane  Doe', email='jane.doe@example.com', phone='', gender='F')
+        Policy.objects.create(
+            client=twin, carrier=carrier, policy_number='X-1', policy_type='HOME', premium_amount=500,
+            sum_insured=1000, start_date=date(2025, 1, 1), end_date=date(2026, 1, 1), renewal_date=date(2026, 1, 1),
+        )
+
+        groups = find_duplicate_groups(self.agent)
+        self.assertEqual(groups, [{'clients': [self.jane.pk, twin.pk], 'confidence': 'high'}])
+
+        self.assertEqual(merge_clients(self.jane, [twin.pk]), 1)
+        self.assertEqual(self.jane.policies.count(), 1)
+        self.assertFalse(Client.objects.filter(pk=twin.pk).exists())
+
+
+@override_settings(STREAMING_LIST_THRESHOLD=3, STREAMING_LIST_CHUNK_SIZE=2)
+class PolicyListFormatTests(APITestCase):
+    def setUp(self):
+        self.agent = User.objects.create_user(username='agent', password='pw')
+        self.client.force_authenticate(self.agent)
+        carrier = Carrier.objects.create(name='Allianz')
+        jane = Client.objects.create(agent=self.agent, name='Jane Doe', email='jane@example.com', phone='1', gender='F')
+        for i in range(5):
+            Policy.objects.create(
+                client=jane, carrier=carrier, policy_number=f"POL-{i}", policy_type='LIFE', premium_amount=100,
+                sum_insured=1000, start_date=date(2025, 1, 1), end_date=date(2026, 1, 1), renewal_date=date(2026, 1, 1),
+            )
+
+    def test_large_list_is_streamed_as_one_json_array(self):
+        response = self.client.get('/api/policies/')
+        self.assertTrue(response.streaming)
+        policies = json.loads(b''.join(response.streaming_content))
+        self.assertEqual([p['policy_number'] for p in policies], [f"POL-{i}" for i in range(5)])
+        self.assertEqual(policies[0]['client_details']['total_policies'], 5)
+
+    def test_small_list_renders_normally(self):
+        response = self.client.get('/api/policies/?client_id=0')
+        self.assertFalse(response.streaming)
+        self.assertEqual(response.json(), [])
+
+    def test_messagepack(self):
+        response = self.client.get('/api/policies/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        policies = msgpack.unpackb(response.content)
+        self.assertEqual(len(policies), 5)
+        self.assertEqual(policies[0]['premium_amount'], '100.00')
+
+
+class PolicyAdminTests(TestCase):
+    def setUp(self):
+        self.agent = User.objects.create_user(username='agent', password='pw')
+        self.carrier = Carrier.objects.create(name='Allianz')
+        self.jane = Client.objects.create(agent=self.agent, name='Jane Doe', email='jane@example.com', phone='1', gender='F')
+        self.policies = [self.add_policy(i) for i in range(3)]
+        self.client.force_login(User.objects.create_superuser(username='admin', password='pw'))
+
+    def add_policy(self, i):
+        return Policy.objects.create(
+            client=self.jane, carrier=self.carrier, policy_number=f"POL-{i:04d}", policy_type='LIFE',
+            premium_amount=100, sum_insured=1000, start_date=date(2025, 1, 1), end_date=date(2026, 1, 1),
+            renewal_date=date(2026, 1, 1),
+        )
+
+    def test_changelist_query_count_does_not_grow_with_rows(self):
+        url = '/admin/policies/policy/'
+        with CaptureQueriesContext(connection) as few_rows:
+            self.client.get(url)
+        for i in range(3, 20):
+            self.add_policy(i)
+        with self.assertNumQueries(len(few_rows)):
+            self.assertContains(self.client.get(url), 'POL-0019')
+
+    def test_search_uses_normalized_number(self):
+        response = self.client.get('/admin/policies/policy/', {'q': 'pol 0002'})
+        self.assertEqual(list(response.context['cl'].result_list), [self.policies[2]])
+
+    def test_client_search_prefix_matches_normalized_keys(self):
+        Client.objects.create(agent=self.agent, name='John Smith', email='js@example.com', phone='+1 555 010 2000', gender='M')
+        url = '/admin/policies/client/'
+
+        for term in ('Doe, Jane', 'JANE@example', '555-010-20'):
+            with self.subTest(term=term):
+                response = self.client.get(url, {'q': term})
+                names = [client.name for client in response.context['cl'].result_list]
+                self.assertEqual(names, ['John Smith'] if term.startswith('555') else ['Jane Doe'])
+
+        response = self.client.get('/admin/autocomplete/', {
+            'app_label': 'policies', 'model_name': 'policy', 'field_name': 'client', 'term': 'doe',
+        })
+        self.assertEqual([r['id'] for r in response.json()['results']], [str(self.jane.pk)])
+
+    def test_bulk_status_change_is_one_update_and_invalidates_forecasts(self):
+        version = book_version(self.agent.pk)
+        response = self.client.post('/admin/policies/policy/', {
+            'action': 'mark_lapsed', '_selected_action': [p.pk for p in self.policies[:2]],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Policy.objects.filter(status='LAPSED').count(), 2)
+        self.assertNotEqual(book_version(self.agent.pk), version)
+
+
+class PolicyArchiveTests(APITestCase):
+    def setUp(self):
+        self.agent = User.objects.create_user(username='agent', password='pw')
+        self.client.force_authenticate(self.agent)
+        self.carrier = Carrier.objects.create(name='Allianz')
+        self.jane = Client.objects.create(agent=self.agent, name='Jane Doe', email='jane@example.com', phone='1', gender='F')
+        self.live = self.add_policy('POL-LIVE', 'ACTIVE', date(2026, 1, 1))
+        self.old = self.add_policy('POL-OLD', 'LAPSED', date(2020, 1, 1))
+        statement = CommissionStatement.objects.create(
+            carrier=self.carrier, statement_date=date(2019, 6, 30), total_amount_paid=0
+        )
+        apply_revision(statement, [{
+            'policy_number': 'POL-OLD', 'transaction_date': '2019-06-15',
+            'amount_expected': '100.00', 'amount_received': '60.00',
+        }])
+        self.line = statement.transactions.get()
+
+    def add_policy(self, number, status, end_date, client=None):
+        return Policy.objects.create(
+            client=client or self.jane, carrier=self.carrier, policy_number=number, policy_type='LIFE',
+            status=status, premium_amount=100, sum_insured=1000, start_date=date(2019, 1, 1),
+            end_date=end_date, renewal_date=end_date,
+        )
+
+    def test_closed_policies_move_with_their_commission_lines(self):
+        call_command('archive_policies', stdout=StringIO())
+
+        self.assertEqual(list(Policy.objects.all()), [self.live])
+        archived = ArchivedPolicy.objects.get()
+        self.assertEqual((archived.pk, archived.policy_number), (self.old.pk, 'POL-OLD'))
+        self.line.refresh_from_db()
+        self.assertEqual((self.line.policy_id, self.line.archived_policy_id), (None, self.old.pk))
+
+    def test_history_is_only_read_on_request(self):
+        call_command('archive_policies', stdout=StringIO())
+
+        self.assertEqual(len(self.client.get('/api/policies/').json()), 1)
+        policies = self.client.get('/api/policies/', {'include_history': 'true'}).json()
+        self.assertEqual([p['policy_number'] for p in policies], ['POL-LIVE', 'POL-OLD'])
+        self.assertIn('archived_at', policies[1])
+
+        url = f"/api/policies/{self.old.pk}/"
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.get(url, {'include_history': 'true'}).json()['status'], 'LAPSED')
+
+        discrepancies = f"/api/commissions/agents/{self.agent.pk}/discrepancies/"
+        self.assertEqual(self.client.get(discrepancies).json()['summary']['count'], 0)
+        self.assertEqual(self.client.get(discrepancies, {'include_history': 'true'}).json()['summary']['count'], 1)
+
+    def test_merge_keeps_archived_policies(self):
+        duplicate = Client.objects.create(agent=self.agent, name='Jane Doe', email='jane@example.com', phone='1', gender='F')
+        self.add_policy('POL-DUP', 'CANCELLED', date(2020, 6, 1), client=duplicate)
+        call_command('archive_policies', stdout=StringIO())
+
+        merge_clients(self.jane, [duplicate.pk])
+
+        self.assertEqual(self.jane.archived_policies.count(), 2)
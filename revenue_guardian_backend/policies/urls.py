@@ -2,13 +2,16 @@ from django.urls import path
 from .views import (
     ClientListCreateView,
     PolicyListCreateView, PolicyDetailView,
-    CarrierListView, ClientRetrieveUpdateDestroyView, PolicyRetrieveUpdateDestroyView
+    CarrierListView, ClientRetrieveUpdateDestroyView, PolicyRetrieveUpdateDestroyView,
+    RevenueForecastView, ClientDuplicatesView, ClientMergeView,
 )
 
 urlpatterns = [
     # Clients
     path('clients/', ClientListCreateView.as_view(), name='client-list-create'),
     path('clients/<int:pk>/', ClientRetrieveUpdateDestroyView.as_view(), name='client-detail'),
+    path('clients/duplicates/', ClientDuplicatesView.as_view(), name='client-duplicates'),
+    path('clients/<int:pk>/merge/', ClientMergeView.as_view(), name='client-merge'),
 
     # Policies
     path('policies/', PolicyListCreateView.as_view(), name='policy-list-create'),
@@ -17,4 +20,7 @@ urlpatterns = [
     
     # Carriers
     path('carriers/', CarrierListView.as_view(), name='carrier-list'),
+
+    # Forecast
+    path('forecast/', RevenueForecastView.as_view(), name='revenue-forecast'),
 ]
\ No newline at end of file
@@ -1,7 +1,16 @@
-from django.shortcuts import render
-from rest_framework import generics, permissions
-from .models import Client, Policy, Carrier
-from .serializers import ClientSerializer, PolicySerializer, CarrierSerializer
+from django.db.models import Count
+from django.shortcuts import get_object_or_404, render
+from rest_framework import generics, permissions, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from config.streaming import StreamingListMixin
+from documents.views import DocumentReferenceMixin
+from .archive import include_history
+from .dedupe import find_duplicate_groups, find_existing, merge_clients
+from .forecast import get_forecast
+from .models import ArchivedPolicy, Client, Policy, Carrier
+from .serializers import ArchivedPolicySerializer, ClientSerializer, PolicySerializer, CarrierSerializer
 
 
 class CarrierListView(generics.ListAPIView):
@@ -11,7 +20,7 @@ class CarrierListView(generics.ListAPIView):
 
 
 # --- Client Views ---
-class ClientListCreateView(generics.ListCreateAPIView):
+class ClientListCreateView(StreamingListMixin, generics.ListCreateAPIView):
     serializer_class = ClientSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -19,7 +28,28 @@ class ClientListCreateView(generics.ListCreateAPIView):
         """
         SECURITY: Only return clients belonging to the logged-in agent.
         """
-        return Client.objects.filter(agent=self.request.user)
+        # policy_count feeds total_policies without a COUNT query per client
+        return Client.objects.filter(agent=self.request.user).annotate(policy_count=Count('policies'))
+
+    def create(self, request, *args, **kwargs):
+        """
+        DEDUPE: Refuse likely duplicates (409 + matches) unless ?allow_duplicate=true.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        if request.query_params.get('allow_duplicate') != 'true':
+            data = serializer.validated_data
+            matches = find_existing(request.user, data.get('name'), data.get('email'), data.get('phone'))
+            if matches:
+                return Response({
+                    'detail': "This client looks like an existing client. Merge, or retry with ?allow_duplicate=true.",
+                    'matches': matches,
+                }, status=status.HTTP_409_CONFLICT)
+
+        self.perform_create(serializer)
+        headers = self.get_success_headers(serializer.data)
+        return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
     def perform_create(self, serializer):
         """
@@ -27,6 +57,34 @@ class ClientListCreateView(generics.ListCreateAPIView):
         """
         serializer.save(agent=self.request.user)
 
+
+class ClientDuplicatesView(APIView):
+    """
+    Groups of the agent's clients that look like the same person ('high'),
+    then name-only 'possible' pairs to review one by one.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        return Response({'groups': find_duplicate_groups(request.user)})
+
+
+class ClientMergeView(APIView):
+    """
+    POST {"duplicates": [ids]}: moves their policies onto this client and deletes them.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, pk):
+        # SECURITY: both sides of the merge must belong to the logged-in agent
+        primary = get_object_or_404(Client.objects.filter(agent=request.user), pk=pk)
+        duplicates = request.data.get('duplicates')
+        if not isinstance(duplicates, list) or not all(isinstance(d, int) for d in duplicates):
+            raise ValidationError({'duplicates': "Expected a list of client IDs."})
+
+        moved = merge_clients(primary, duplicates)
+        return Response({'client': ClientSerializer(primary).data, 'policies_moved': moved})
+
 class ClientDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = ClientSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -47,7 +105,7 @@ class ClientRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
         return Client.objects.filter(agent=self.request.user)
 
 # --- Policy Views ---
-class PolicyListCreateView(generics.ListCreateAPIView):
+class PolicyListCreateView(StreamingListMixin, DocumentReferenceMixin, generics.ListCreateAPIView):
     serializer_class = PolicySerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -55,8 +113,8 @@ class PolicyListCreateView(generics.ListCreateAPIView):
         # Return policies where the client belongs to the logged-in agent
         # return Policy.objects.filter(client__agent=self.request.user)
         
-        # 1. Start with all policies owned by this agent
-        queryset = Policy.objects.filter(client__agent=self.request.user)
+        # 1. Start with all policies owned by this agent (nested client/carrier in the same query)
+        queryset = Policy.objects.filter(client__agent=self.request.user).select_related('client', 'carrier')
         
         # 2. Check if the URL has ?client_id=X
         client_id = self.request.query_params.get('client_id')
@@ -67,7 +125,36 @@ class PolicyListCreateView(generics.ListCreateAPIView):
             
         return queryset
 
-class PolicyRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+    def prepare_chunk(self, policies):
+        # client_details.total_policies: one GROUP BY per chunk instead of a COUNT per row
+        counts = dict(
+            Policy.objects.filter(client_id__in={policy.client_id for policy in policies})
+            .values('client_id').annotate(n=Count('id')).values_list('client_id', 'n')
+        )
+        for policy in policies:
+            # select_related builds one Client instance per row
+            policy.client.policy_count = counts.get(policy.client_id, 0)
+
+    def get_archived_queryset(self):
+        queryset = ArchivedPolicy.objects.filter(client__agent=self.request.user).select_related('client', 'carrier')
+        client_id = self.request.query_params.get('client_id')
+        if client_id:
+            queryset = queryset.filter(client_id=client_id)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        """
+        ?include_history=true appends the agent's archived policies (read-only).
+        """
+        if not include_history(request):
+            return super().list(request, *args, **kwargs)
+        live = list(self.filter_queryset(self.get_queryset()))
+        archived = list(self.get_archived_queryset())
+        self.prepare_chunk(archived)
+        history = ArchivedPolicySerializer(archived, many=True, context=self.get_serializer_context()).data
+        return Response(self.serialize_chunk(live) + history)
+
+class PolicyRetrieveUpdateDestroyView(DocumentReferenceMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = PolicySerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -75,9 +162,32 @@ class PolicyRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
         # Security: Only allow agents to edit their own policies
         return Policy.objects.filter(client__agent=self.request.user)
 
+    def retrieve(self, request, *args, **kwargs):
+        # With ?include_history=true, an archived policy is still readable at its old URL
+        if include_history(request) and not self.get_queryset().filter(pk=kwargs['pk']).exists():
+            archived = get_object_or_404(
+                ArchivedPolicy.objects.filter(client__agent=request.user).select_related('client', 'carrier'),
+                pk=kwargs['pk'],
+            )
+            return Response(ArchivedPolicySerializer(archived).data)
+        return super().retrieve(request, *args, **kwargs)
+
 class PolicyDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = PolicySerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
         return Policy.objects.filter(client__agent=self.request.user)
+
+
+# --- Forecast Views ---
+class RevenueForecastView(APIView):
+    """
+    12-month premium/commission projection for the logged-in agent's book,
+    split by carrier and policy type, plus premium at risk.
+    Cached until the agent's policies change.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        return Response(get_forecast(request.user))
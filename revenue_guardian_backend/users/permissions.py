@@ -0,0 +1,12 @@
+from rest_framework import permissions
+
+
+class IsAgencyAdmin(permissions.BasePermission):
+    """
+    Agency-wide data (carrier statements, reconciliation) is managed by
+    agency admins, not by individual agents.
+    """
+    message = "Only agency admins can perform this action."
+
+    def has_permission(self, request, view):
+        return bool(request.user and request.user.is_authenticated and request.user.is_agency_admin)
@@ -1,7 +1,8 @@
 import React, { useState, useEffect } from 'react';
-import { createClient, updateClient } from '../services/api';
+import axios from 'axios';
+import { createClient, updateClient, type DuplicateMatch } from '../services/api';
 import toast from 'react-hot-toast';
-import { User, Phone, Mail, MapPin } from 'lucide-react';
+import { User, Phone, Mail, MapPin, AlertTriangle } from 'lucide-react';
 import { useNavigate } from 'react-router-dom';
 
 interface Client {
@@ -30,16 +31,17 @@ const ClientForm: React.FC<ClientFormProps> = ({ initialData, onSuccess }) => {
         address: initialData?.address || '',
     });
     const [loading, setLoading] = useState(false);
+    const [matches, setMatches] = useState<DuplicateMatch[]>([]);
 
     const handleChange = (e: React.ChangeEvent<HTMLInputElement | HTMLSelectElement | HTMLTextAreaElement>) => {
         setFormData({
             ...formData,
             [e.target.name]: e.target.value,
         });
+        setMatches([]); // Edited details need a fresh duplicate check
     };
 
-    const handleSubmit = async (e: React.FormEvent) => {
-        e.preventDefault();
+    const submit = async (allowDuplicate: boolean) => {
         setLoading(true);
         
         try {
@@ -53,7 +55,7 @@ const ClientForm: React.FC<ClientFormProps> = ({ initialData, onSuccess }) => {
                 response = await updateClient(initialData.id, clientPayload);
                 toast.success(`Client ${formData.name} updated successfully!`);
             } else {
-                response = await createClient(clientPayload);
+                response = await createClient(clientPayload, allowDuplicate);
                 toast.success(`Client ${formData.name} created successfully!`);
             }
             
@@ -61,6 +63,11 @@ const ClientForm: React.FC<ClientFormProps> = ({ initialData, onSuccess }) => {
             onSuccess(response.id); 
 
         } catch (error) {
+            // Likely duplicate: show the existing clients and let the agent decide
+            if (!isEditMode && axios.isAxiosError(error) && error.response?.status === 409) {
+                setMatches(error.response.data.matches || []);
+                return;
+            }
             console.error("Client form submission error:", error);
             toast.error(`Failed to ${isEditMode ? 'update' : 'create'} client.`);
         } finally {
@@ -68,6 +75,11 @@ const ClientForm: React.FC<ClientFormProps> = ({ initialData, onSuccess }) => {
         }
     };
 
+    const handleSubmit = (e: React.FormEvent) => {
+        e.preventDefault();
+        submit(false);
+    };
+
     return (
         <form onSubmit={handleSubmit} className="space-y-6">
             <h2 className="text-xl font-semibold text-gray-800">
@@ -144,6 +156,38 @@ const ClientForm: React.FC<ClientFormProps> = ({ initialData, onSuccess }) => {
                 </div>
             </div>
 
+            {/* Duplicate Warning */}
+            {matches.length > 0 && (
+                <div className="border border-yellow-300 bg-yellow-50 rounded-lg p-4 space-y-3">
+                    <div className="flex items-center gap-2 text-yellow-800 font-medium">
+                        <AlertTriangle className="h-5 w-5" />
+                        This client looks like an existing client.
+                    </div>
+                    <ul className="space-y-2">
+                        {matches.map((match) => (
+                            <li key={match.id} className="flex items-center justify-between text-sm text-gray-700">
+                                <span>{match.name} · {match.email || '—'} · {match.phone || '—'}</span>
+                                <button
+                                    type="button"
+                                    onClick={() => navigate(`/clients/${match.id}`)}
+                                    className="text-blue-600 hover:underline"
+                                >
+                                    Open existing
+                                </button>
+                            </li>
+                        ))}
+                    </ul>
+                    <button
+                        type="button"
+                        disabled={loading}
+                        onClick={() => submit(true)}
+                        className="text-sm bg-yellow-600 text-white px-4 py-1.5 rounded-lg hover:bg-yellow-700 transition disabled:opacity-50"
+                    >
+                        Create anyway
+                    </button>
+                </div>
+            )}
+
             {/* Submit Button */}
             <div className="flex justify-end space-x-3">
                 <button
@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react';
 import { AlertTriangle, Search, Calendar, ChevronDown } from 'lucide-react';
 import { useAuth } from '../context/AuthContext';
-import { getPolicyList } from '../services/api'; 
+import { getPolicyList, subscribeToEvents } from '../services/api'; 
 import toast from 'react-hot-toast';
 import { Link } from 'react-router-dom';
 
@@ -41,6 +41,15 @@ const Dashboard = () => {
             }
         };
         fetchPolicies();
+
+        // Live renewal alerts: patch the one policy in place instead of re-fetching the list
+        return subscribeToEvents((event) => {
+            if (event.kind !== 'policy.pending') return;
+            setPolicies(current => current.map(p =>
+                p.id === event.data.policy ? { ...p, status: event.data.status } : p
+            ));
+            toast(`Renewal due in ${event.data.days_left} days: ${event.data.client}`, { icon: '⚠️' });
+        });
     }, []);
 
     // Filter Logic
@@ -56,9 +56,18 @@ export const getClient = async (id: string) => {
   return response.data;
 };
 
-export const createClient = async (clientData: ClientFormData) => {
-  // POST request to create a new client
-  const response = await api.post('clients/', clientData);
+export interface DuplicateMatch {
+  id: number;
+  name: string;
+  email: string;
+  phone: string;
+}
+
+export const createClient = async (clientData: ClientFormData, allowDuplicate = false) => {
+  // POST request to create a new client; the server answers 409 + matches for likely duplicates
+  const response = await api.post('clients/', clientData, {
+    params: allowDuplicate ? { allow_duplicate: 'true' } : undefined,
+  });
   return response.data;
 };
 
@@ -95,4 +104,53 @@ export const updatePolicy = async (id: number, data: PolicyFormData) => {
   return response.data;
 };
 
+export interface AgentEvent {
+  id: number;
+  kind: 'policy.pending' | 'statement.progress' | 'import.completed';
+  data: Record<string, any>;
+}
+
+// Opens the agent's server-sent event stream (/api/events/).
+// EventSource cannot send the Authorization header, so we first exchange
+// the JWT for a short-lived ticket. Returns a function that closes the stream.
+export const subscribeToEvents = (onEvent: (event: AgentEvent) => void) => {
+  const kinds: AgentEvent['kind'][] = ['policy.pending', 'statement.progress', 'import.completed'];
+  let source: EventSource | null = null;
+  let lastEventId = '';
+  let closed = false;
+
+  const connect = async () => {
+    try {
+      const { data } = await api.post('events/ticket/');
+      if (closed) return;
+      // First connection: start at the server's high-water mark instead of replaying the log
+      if (!lastEventId) lastEventId = String(data.last_event_id);
+      const params = new URLSearchParams({ ticket: data.ticket, last_event_id: lastEventId });
+      source = new EventSource(`${api.defaults.baseURL}events/?${params}`);
+    } catch {
+      if (!closed) setTimeout(connect, 10000);
+      return;
+    }
+
+    kinds.forEach((kind) => {
+      source!.addEventListener(kind, (message) => {
+        const { lastEventId: id, data } = message as MessageEvent;
+        lastEventId = id;
+        onEvent({ id: Number(id), kind, data: JSON.parse(data) });
+      });
+    });
+
+    // The browser retries by itself; once the ticket has expired it gives up, so fetch a new one
+    source.onerror = () => {
+      if (source?.readyState === EventSource.CLOSED && !closed) setTimeout(connect, 3000);
+    };
+  };
+
+  connect();
+  return () => {
+    closed = true;
+    source?.close();
+  };
+};
+
 export default api;
\ No newline at end of file